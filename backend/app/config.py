@@ -27,6 +27,8 @@ class Settings(BaseSettings):
         default="eldenring_db",
         description="Nombre de la base de datos"
     )
+    # Compresión de red con MongoDB, en orden de preferencia ("" = sin compresión)
+    MONGO_COMPRESSORS: str = Field(default="zstd,zlib")
     
     # API
     API_V1_PREFIX: str = Field(default="/api/v1")
@@ -56,6 +58,11 @@ class Settings(BaseSettings):
     DEFAULT_PAGE_SIZE: int = Field(default=20)
     MAX_PAGE_SIZE: int = Field(default=100)
     
+    # Caché en memoria de consultas agregadas
+    CACHE_ENABLED: bool = Field(default=True)
+    CACHE_TTL_SECONDS: int = Field(default=900)
+    CACHE_MAX_SIZE: int = Field(default=128)
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,4 +1,4 @@
-from pymongo import MongoClient
+from pymongo import AsyncMongoClient
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
 from typing import Optional
 import logging
@@ -10,13 +10,40 @@ class MongoDB:
     """
     Clase para manejar la conexión a MongoDB de forma singleton.
     Garantiza una única conexión reutilizable en toda la aplicación.
+    
+    Usa el cliente asíncrono nativo de PyMongo, de modo que las consultas
+    no bloquean el event loop de FastAPI.
     """
     
-    client: Optional[MongoClient] = None
+    client: Optional[AsyncMongoClient] = None
     database = None
     
     @classmethod
-    def connect(cls):
+    def _create_client(cls) -> None:
+        """
+        Crea el cliente y la referencia a la base de datos.
+        El cliente conecta de forma perezosa en la primera operación.
+        """
+        cls.client = AsyncMongoClient(
+            settings.MONGO_URI,
+            # Aumentamos el timeout para dar margen a los cold starts de Render (Free tier)
+            serverSelectionTimeoutMS=30000, 
+            connectTimeoutMS=20000,
+            socketTimeoutMS=20000,
+            # Ajustamos el pool de conexiones para el plan Free de Render
+            maxPoolSize=20,
+            minPoolSize=5,
+            # Reutilizar conexiones inactivas en lugar de cerrarlas y reabrirlas
+            maxIdleTimeMS=300000,
+            # Las respuestas grandes (listados por categoría) viajan comprimidas
+            compressors=settings.MONGO_COMPRESSORS or None,
+            retryWrites=True,
+            w='majority'
+        )
+        cls.database = cls.client[settings.DATABASE_NAME]
+    
+    @classmethod
+    async def connect(cls):
         """
         Establece conexión con MongoDB
         """
@@ -24,25 +51,13 @@ class MongoDB:
             if cls.client is None:
                 logger.info(f"Conectando a MongoDB: {settings.DATABASE_NAME}")
                 
-                cls.client = MongoClient(
-                    settings.MONGO_URI,
-                    # Aumentamos el timeout para dar margen a los cold starts de Render (Free tier)
-                    serverSelectionTimeoutMS=30000, 
-                    connectTimeoutMS=20000,
-                    socketTimeoutMS=20000,
-                    # Ajustamos el pool de conexiones para el plan Free de Render
-                    maxPoolSize=20,
-                    minPoolSize=5,
-                    retryWrites=True,
-                    w='majority'
-                )
+                cls._create_client()
                 
                 # Verificar conexión
-                cls.client.admin.command('ping')
-                cls.database = cls.client[settings.DATABASE_NAME]
+                await cls.client.admin.command('ping')
                 
                 # Log de colecciones disponibles
-                collections = cls.database.list_collection_names()
+                collections = await cls.database.list_collection_names()
                 logger.info(f"Conexión exitosa a MongoDB")
                 logger.info(f"Colecciones disponibles: {len(collections)}")
                 
@@ -62,13 +77,13 @@ class MongoDB:
             raise
     
     @classmethod
-    def close(cls):
+    async def close(cls):
         """
         Cierra la conexión a MongoDB
         """
         if cls.client:
             logger.info("Cerrando conexión a MongoDB...")
-            cls.client.close()
+            await cls.client.close()
             cls.client = None
             cls.database = None
             logger.info("Conexión cerrada")
@@ -77,10 +92,10 @@ class MongoDB:
     def get_database(cls):
         """
         Obtiene la instancia de la base de datos.
-        Si no existe conexión, la establece.
+        Si no existe cliente, lo crea (la conexión se abre en la primera operación).
         """
         if cls.database is None:
-            cls.connect()
+            cls._create_client()
         return cls.database
     
     @classmethod
@@ -92,13 +107,13 @@ class MongoDB:
             collection_name: Nombre de la colección
             
         Returns:
-            Collection object de PyMongo
+            AsyncCollection de PyMongo
         """
         db = cls.get_database()
         return db[collection_name]
     
     @classmethod
-    def health_check(cls) -> dict:
+    async def health_check(cls) -> dict:
         """
         Verifica el estado de la conexión a MongoDB
         
@@ -107,9 +122,9 @@ class MongoDB:
         """
         try:
             db = cls.get_database()
-            db.command('ping')
+            await db.command('ping')
             
-            collections = db.list_collection_names()
+            collections = await db.list_collection_names()
             
             return {
                 "status": "healthy",
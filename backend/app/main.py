@@ -7,6 +7,7 @@ import time
 
 from app.config import settings
 from app.database import MongoDB
+from app.services import weapon_service, boss_service, armor_service, class_service
 
 # Configurar logging
 logging.basicConfig(
@@ -28,7 +29,12 @@ async def lifespan(app: FastAPI):
     
     try:
         # Conectar a MongoDB
-        MongoDB.connect()
+        await MongoDB.connect()
+        
+        # Hooks de arranque de los servicios (índices, etc.)
+        for service in (weapon_service, boss_service, armor_service, class_service):
+            await service.startup()
+        
         logger.info("Aplicación lista")
     except Exception as e:
         logger.error(f"Error al iniciar: {e}")
@@ -38,7 +44,7 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Cerrando aplicación...")
-    MongoDB.close()
+    await MongoDB.close()
     logger.info("Aplicación cerrada correctamente")
 
 # Crear instancia de FastAPI
@@ -129,7 +135,7 @@ async def health_check():
     """
     Endpoint de health check - Verifica el estado de la API y MongoDB
     """
-    mongo_health = MongoDB.health_check()
+    mongo_health = await MongoDB.health_check()
     
     return {
         "status": "healthy" if mongo_health["status"] == "healthy" else "degraded",
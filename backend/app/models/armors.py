@@ -136,6 +136,7 @@ class ArmorListResponse(BaseDocument):
     total: int = Field(description="Número total de armaduras")
     skip: int = Field(description="Registros omitidos")
     limit: int = Field(description="Límite de registros por pagina")
+    next_cursor: Optional[str] = Field(default=None, description="Cursor para pedir la siguiente página (after_id)")
 
 class ArmorFilterParams(FilterParams):
     """
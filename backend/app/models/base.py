@@ -160,6 +160,10 @@ class PaginationParams(BaseModel):
     limit: int = Field(default=20, ge=1, le=500, description="Número máximo de registros")
     sort_by: Optional[str] = Field(default=None, description="Campo por el cual ordenar")
     sort_order: int = Field(default=1, description="Orden: 1 (ascendente) o -1 (descendente)")
+    after_id: Optional[str] = Field(
+        default=None,
+        description="Cursor de la página anterior (next_cursor); si se indica se ignora skip"
+    )
 
     @field_validator('sort_order')
     @classmethod
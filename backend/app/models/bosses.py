@@ -146,6 +146,7 @@ class BossListResponse(BaseDocument):
     total: int = Field(description="Total de registros")
     skip: int = Field(description="Registros omitidos")
     limit: int = Field(description="Límite de registros por página")
+    next_cursor: Optional[str] = Field(default=None, description="Cursor para pedir la siguiente página (after_id)")
 
 
 class BossFilterParams(FilterParams):
@@ -223,10 +224,15 @@ class BossStatistics(BaseDocument):
 class BossByRegionResponse(BaseDocument):
     """
     Modelo para agrupar jefes por región.
+    Formato columnar: las listas son paralelas (el índice i es el mismo jefe).
+    El detalle completo de cada jefe se obtiene por ID o por región.
     """
     region: str = Field(description="Nombre de la región")
     boss_count: int = Field(description="Número de jefes en la región")
-    bosses: List[BossResponse] = Field(description="Lista de jefes")
+    ids: List[str] = Field(description="IDs de los jefes")
+    names: List[str] = Field(description="Nombres de los jefes")
+    images: List[Optional[str]] = Field(description="URLs de las imágenes")
+    drop_counts: List[int] = Field(description="Número de drops de cada jefe")
 
 
 class BossDropAnalysis(BaseDocument):
@@ -254,6 +260,9 @@ class SharebearerAnalysis(BaseDocument):
     Jefes que otorgan Gran Runa y son obligatorios para el juego.
     """
     total_shardbearers: int = Field(description="Total de Shardbearers")
-    shardbearers: List[BossResponse] = Field(description="Lista de Shardbearers")
+    shardbearers: List[BossResponse] = Field(
+        default_factory=list,
+        description="Lista de Shardbearers (vacía si no se solicita)"
+    )
     great_runes: List[str] = Field(description="Lista de Grandes Runas disponibles")
     regions_with_shardbearers: List[str] = Field(description="Regiones con Shardbearers")
\ No newline at end of file
@@ -158,6 +158,7 @@ class ClassListResponse(BaseDocument):
     total: int = Field(description="Total de registros")
     skip: int = Field(description="Registros omitidos")
     limit: int = Field(description="Límite de registros por página")
+    next_cursor: Optional[str] = Field(default=None, description="Cursor para pedir la siguiente página (after_id)")
 
 
 class ClassFilterParams(FilterParams):
@@ -128,6 +128,7 @@ class WeaponListResponse(BaseDocument):
     total: int = Field(description="Total de registros")
     skip: int = Field(description="Registros omitidos")
     limit: int = Field(description="Límite de registros por página")
+    next_cursor: Optional[str] = Field(default=None, description="Cursor para pedir la siguiente página (after_id)")
 
 class WeaponFilterParams(FilterParams):
     """
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, Path, status, Body
+from fastapi import APIRouter, Depends, Path, Query, status, Body
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 import logging
 
@@ -8,7 +9,8 @@ from app.models.bosses import (
     BossCreate,
     BossUpdate,
     BossListResponse,
-    BossFilterParams
+    BossFilterParams,
+    SharebearerAnalysis
 )
 from app.models.base import PaginationParams
 from app.models.responses import MessageResponse
@@ -51,6 +53,71 @@ async def create_boss(boss: BossCreate):
     logger.info(f"Creando nuevo jefe: {boss.name}")
     return await boss_service.create(boss)
 
+@router.get(
+    "/region/{region}",
+    response_model=List[BossResponse],
+    summary="Obtener jefes por región",
+    description="Retorna todos los jefes de una región (respuesta en streaming)",
+    tags=["Bosses - Queries"]
+)
+async def get_bosses_by_region(
+    region: str = Path(..., description="Nombre de la región (case-insensitive)", example="Limgrave")
+):
+    """
+    Obtiene todos los jefes de una región.
+    
+    La respuesta se serializa documento a documento; los errores de la
+    consulta se detectan antes de empezar a enviarla.
+    """
+    logger.info(f"Obteniendo jefes de la región: {region}")
+    return StreamingResponse(
+        await boss_service.stream_by_region(region),
+        media_type="application/json"
+    )
+
+@router.get(
+    "/by-drop/{item_name}",
+    response_model=List[BossResponse],
+    summary="Buscar jefes por drop",
+    description="Retorna los jefes que dropean un item (respuesta en streaming)",
+    tags=["Bosses - Queries"]
+)
+async def search_bosses_by_drop(
+    item_name: str = Path(..., description="Nombre del item (búsqueda parcial)", example="Great Rune")
+):
+    """
+    Busca jefes que dropean un item específico.
+    
+    La respuesta se serializa documento a documento; los errores de la
+    consulta se detectan antes de empezar a enviarla.
+    """
+    logger.info(f"Buscando jefes que dropean: {item_name}")
+    return StreamingResponse(
+        await boss_service.stream_by_drop(item_name),
+        media_type="application/json"
+    )
+
+@router.get(
+    "/shardbearers",
+    response_model=SharebearerAnalysis,
+    summary="Análisis de Shardbearers",
+    description="Retorna las Grandes Runas y regiones de los Shardbearers",
+    tags=["Bosses - Analytics"]
+)
+async def get_shardbearers(
+    include_bosses: bool = Query(
+        default=False,
+        description="Incluir la lista completa de Shardbearers"
+    )
+):
+    """
+    Obtiene el análisis de Shardbearers (jefes con Gran Runa).
+    
+    La lista completa de jefes es opcional porque requiere una consulta más.
+    """
+    logger.info("Obteniendo análisis de shardbearers")
+    return await boss_service.get_shardbearers(include_bosses=include_bosses)
+
 @router.get(
     "/by-id/{boss_id}",
     response_model=BossResponse,
@@ -8,10 +8,12 @@ from app.models.classes import (
     ClassCreate,
     ClassUpdate,
     ClassListResponse,
-    ClassFilterParams
+    ClassFilterParams,
+    BuildRecommendation
 )
 from app.models.base import PaginationParams
 from app.models.responses import MessageResponse
+from app.utils.cache import etag_cache
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +38,112 @@ async def get_classes(
     result = await class_service.get_classes(filters, pagination)
     return ClassListResponse(**result)
 
+@router.get(
+    "/archetype/{archetype}",
+    response_model=List[ClassResponse],
+    summary="Obtener clases por arquetipo",
+    description="Retorna las clases de un arquetipo específico",
+    tags=["Classes - Queries"],
+    dependencies=[Depends(etag_cache(class_service))]
+)
+async def get_classes_by_archetype(
+    archetype: str = Path(..., description="Arquetipo (Strength, Dexterity, Quality, Sorcerer, etc.)")
+):
+    """
+    Obtiene las clases de un arquetipo (case-insensitive).
+    
+    **Ejemplo de uso:**
+    ```
+    GET /api/v1/classes/archetype/Quality
+    ```
+    """
+    return await class_service.get_by_archetype(archetype)
+
+@router.get(
+    "/best-for/{build_type}",
+    response_model=dict,
+    summary="Mejor clase inicial para un build",
+    description="Recomienda la mejor clase inicial y alternativas para un tipo de build",
+    tags=["Classes - Analytics"],
+    dependencies=[Depends(etag_cache(class_service))]
+)
+async def get_best_starting_class(
+    build_type: str = Path(..., description="Tipo de build (strength, dexterity, quality, faith, etc.)")
+):
+    """
+    Recomienda la mejor clase inicial para un tipo de build.
+    
+    **Ejemplo de uso:**
+    ```
+    GET /api/v1/classes/best-for/quality
+    ```
+    """
+    return await class_service.get_best_starting_class(build_type)
+
+@router.get(
+    "/stat-distribution",
+    response_model=dict,
+    summary="Distribución de estadísticas",
+    description="Retorna promedios, máximos y mínimos de stats entre todas las clases",
+    tags=["Classes - Analytics"],
+    dependencies=[Depends(etag_cache(class_service))]
+)
+async def get_stat_distribution():
+    """
+    Analiza la distribución de estadísticas iniciales entre clases.
+    
+    **Ejemplo de uso:**
+    ```
+    GET /api/v1/classes/stat-distribution
+    ```
+    """
+    return await class_service.get_stat_distribution()
+
+@router.get(
+    "/statistics",
+    response_model=dict,
+    summary="Estadísticas de clases",
+    description="Retorna estadísticas agregadas de todas las clases",
+    tags=["Classes - Analytics"],
+    dependencies=[Depends(etag_cache(class_service))]
+)
+async def get_class_statistics():
+    """
+    Obtiene estadísticas generales de las clases.
+    
+    **Incluye:**
+    - Total de clases
+    - Distribución por arquetipo
+    - Rango de niveles iniciales
+    
+    **Ejemplo de uso:**
+    ```
+    GET /api/v1/classes/statistics
+    ```
+    """
+    return await class_service.get_statistics()
+
+@router.get(
+    "/by-id/{class_id}/build-recommendation",
+    response_model=BuildRecommendation,
+    summary="Recomendación de build",
+    description="Genera recomendaciones de armas, hechizos y stats para una clase",
+    tags=["Classes - Analytics"],
+    dependencies=[Depends(etag_cache(class_service))]
+)
+async def get_build_recommendation(
+    class_id: str = Path(..., description="ID de la clase")
+):
+    """
+    Genera recomendaciones de build para una clase.
+    
+    **Ejemplo de uso:**
+    ```
+    GET /api/v1/classes/by-id/507f1f77bcf86cd799439011/build-recommendation
+    ```
+    """
+    return await class_service.get_build_recommendation(class_id)
+
 @router.post(
     "/",
     response_model=ClassResponse,
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, Query, Path, Body, status
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 import logging
 
@@ -42,6 +43,7 @@ async def get_weapons(
     GET /api/v1/weapons?category=Katana&min_damage=50&limit=10
     GET /api/v1/weapons?min_strength=20&max_strength=40
     GET /api/v1/weapons?has_passive=true
+    GET /api/v1/weapons?limit=50&after_id=<next_cursor de la página anterior>
     ```
     """
     result = await weapon_service.get_weapons(filters, pagination)
@@ -115,6 +117,32 @@ async def get_weapons_by_category(
     
     return weapons
 
+@router.get(
+    "/category/{category}/stream",
+    response_model=List[WeaponResponse],
+    summary="Obtener armas por categoría (NDJSON)",
+    description="Retorna las armas de una categoría como NDJSON, un arma por línea",
+    tags=["Weapons - Queries"]
+)
+async def stream_weapons_by_category(
+    category: str = Path(..., description="Categoría de arma (case-insensitive)", example="Katana")
+):
+    """
+    Versión en streaming de `/category/{category}`.
+    
+    Cada arma se envía en cuanto sale del cursor, sin cargar la categoría
+    completa en memoria.
+    
+    **Ejemplo de uso:**
+    ```
+    GET /api/v1/weapons/category/Katana/stream
+    ```
+    """
+    return StreamingResponse(
+        await weapon_service.stream_by_category(category),
+        media_type="application/x-ndjson"
+    )
+
 @router.get(
     "/by-id/{weapon_id}",
     response_model=WeaponResponse,
@@ -174,6 +202,31 @@ async def get_best_damage_to_weight_weapons(
     """
     return await weapon_service.get_best_damage_to_weight(limit, category)
 
+@router.get(
+    "/best-damage-to-weight/by-category",
+    response_model=List[dict],
+    summary="Mejor ratio daño/peso por categoría",
+    description="Retorna las armas con mejor relación daño/peso de cada categoría",
+    tags=["Weapons - Analytics"]
+)
+async def get_best_damage_to_weight_by_category(
+    limit: int = Query(
+        default=3,
+        ge=1,
+        le=10,
+        description="Número de armas por categoría"
+    )
+):
+    """
+    Obtiene el top de armas por ratio daño/peso dentro de cada categoría.
+    
+    **Ejemplo de uso:**
+    ```
+    GET /api/v1/weapons/best-damage-to-weight/by-category?limit=3
+    ```
+    """
+    return await weapon_service.get_best_damage_to_weight_by_category(limit)
+
 @router.post(
     "/compare",
     response_model=dict,
@@ -249,6 +302,29 @@ async def get_weapons_by_build_type(
     """
     return await weapon_service.get_by_build_type(build_type)
 
+@router.get(
+    "/by-build/{build_type}/stream",
+    response_model=List[WeaponResponse],
+    summary="Armas recomendadas por build (NDJSON)",
+    description="Retorna las armas recomendadas para un build como NDJSON, un arma por línea",
+    tags=["Weapons - Analytics"]
+)
+async def stream_weapons_by_build_type(
+    build_type: str = Path(..., description="Tipo de build", example="strength")
+):
+    """
+    Versión en streaming de `/by-build/{build_type}`.
+    
+    **Ejemplo de uso:**
+    ```
+    GET /api/v1/weapons/by-build/quality/stream
+    ```
+    """
+    return StreamingResponse(
+        await weapon_service.stream_by_build_type(build_type),
+        media_type="application/x-ndjson"
+    )
+
 @router.get(
     "/statistics",
     response_model=dict,
@@ -93,6 +93,8 @@ class ArmorService(BaseService[ArmorResponse]):
             
             return await self.get_many(query, pagination)
             
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error obteniendo armaduras: {e}")
             raise HTTPException(
@@ -120,7 +122,7 @@ class ArmorService(BaseService[ArmorResponse]):
                 )
             
             query = {"category": slot}
-            documents = list(self.collection.find(query))
+            documents = await self.collection.find(query).to_list()
             
             return [self._document_to_model(doc) for doc in documents]
             
@@ -238,10 +240,11 @@ class ArmorService(BaseService[ArmorResponse]):
                 if optimization.required_poise is not None and optimization.prioritize != "poise":
                     query["resistance.poise"] = {"$gte": optimization.required_poise / 4}
                 
-                pieces = list(
+                pieces = await (
                     self.collection.find(query)
                     .sort(prioritize_field, -1)
                     .limit(5)
+                    .to_list()
                 )
                 
                 if pieces:
@@ -1,14 +1,20 @@
-from typing import List, Optional, Dict, Any, Generic, TypeVar, Type
-from pymongo.collection import Collection
-from pymongo import ASCENDING, DESCENDING
+from typing import List, Optional, Dict, Any, Generic, TypeVar, Type, AsyncIterator, Hashable
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.asynchronous.cursor import AsyncCursor
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
 from bson import ObjectId
 from fastapi import HTTPException, status
+from pydantic import TypeAdapter
+import asyncio
 import logging
 import json
 import ast
 
+from app.config import settings
 from app.database import MongoDB
 from app.models.base import BaseDocument, PaginationParams
+from app.utils.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +33,11 @@ class BaseService(Generic[T]):
     - Soporte para Pydantic v2
     """
     
+    # Índices que cada servicio declara para sus consultas (ver ensure_indexes)
+    indexes: List[IndexModel] = []
+    # Nombres de índices retirados de `indexes`; se eliminan al arrancar
+    obsolete_indexes: List[str] = []
+    
     def __init__(self, collection_name: str, model_class: Type[T]):
         """
         Args:
@@ -35,15 +46,74 @@ class BaseService(Generic[T]):
         """
         self.collection_name = collection_name
         self.model_class = model_class
-        self._collection: Optional[Collection] = None
+        self._collection: Optional[AsyncCollection] = None
+        # Validador compilado para listas completas de documentos
+        self._list_adapter = TypeAdapter(List[model_class])
+        self._cache = TTLCache(
+            maxsize=settings.CACHE_MAX_SIZE,
+            ttl=settings.CACHE_TTL_SECONDS
+        )
+        # Consultas cacheadas en curso, compartidas por llamadas concurrentes
+        self._inflight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        # Se incrementa en cada escritura; una consulta iniciada antes no se cachea
+        self._cache_generation = 0
     
     @property
-    def collection(self) -> Collection:
+    def collection(self) -> AsyncCollection:
         """Lazy loading de la colección."""
         if self._collection is None:
             self._collection = MongoDB.get_collection(self.collection_name)
         return self._collection
     
+    async def startup(self) -> None:
+        """
+        Hook de arranque del servicio.
+        Se ejecuta desde el lifespan de la aplicación tras conectar a MongoDB.
+        """
+        await self.ensure_indexes()
+    
+    async def ensure_indexes(self) -> None:
+        """
+        Crea los índices declarados en `indexes` y elimina `obsolete_indexes`.
+        
+        La operación es idempotente: MongoDB ignora los índices que ya existen
+        con la misma especificación.
+        """
+        for name in self.obsolete_indexes:
+            try:
+                await self.collection.drop_index(name)
+                logger.info(f"Índice obsoleto {name} eliminado de {self.collection_name}")
+            except OperationFailure:
+                # Ya no existe (o la colección aún no se ha creado)
+                pass
+            except Exception as e:
+                logger.warning(f"No se pudo eliminar el índice {name} de {self.collection_name}: {e}")
+        
+        if not self.indexes:
+            return
+        
+        try:
+            names = await self.collection.create_indexes(self.indexes)
+            logger.info(f"Índices de {self.collection_name}: {', '.join(names)}")
+        except Exception as e:
+            logger.warning(f"No se pudieron crear índices de {self.collection_name}: {e}")
+    
+    async def _after_write(self, item_id: Optional[ObjectId] = None) -> None:
+        """
+        Hook ejecutado tras cada escritura exitosa (create/update/delete).
+        Invalida la caché de consultas del servicio.
+        
+        Las consultas que siguen en curso se descartan: las llamadas nuevas
+        lanzan otra y el resultado de las viejas no se guarda en caché
+        (ver `_cache_generation`).
+        
+        Args:
+            item_id: ID del documento escrito; None en escrituras masivas
+        """
+        self._cache_generation += 1
+        self._inflight.clear()
+        self._cache.clear()
+    
     def _validate_object_id(self, item_id: str) -> ObjectId:
         """
         Valida y convierte string a ObjectId.
@@ -347,6 +417,23 @@ class BaseService(Generic[T]):
             
             raise
     
+    def _documents_to_models(self, documents: List[Dict[str, Any]]) -> List[T]:
+        """
+        Convierte una lista de documentos de MongoDB a modelos Pydantic.
+        
+        Valida la lista completa en una sola llamada al núcleo compilado de
+        Pydantic en lugar de instanciar cada modelo por separado.
+        
+        Args:
+            documents: Documentos de MongoDB
+            
+        Returns:
+            Lista de modelos Pydantic
+        """
+        return self._list_adapter.validate_python(
+            [self._normalize_document(doc) for doc in documents]
+        )
+    
     def _build_filter_query(self, filters: Dict[str, Any]) -> Dict[str, Any]:
         """
         Construye query de MongoDB desde filtros.
@@ -405,7 +492,7 @@ class BaseService(Generic[T]):
         obj_id = self._validate_object_id(item_id)
         
         try:
-            document = self.collection.find_one({"_id": obj_id})
+            document = await self.collection.find_one({"_id": obj_id})
             
             if not document:
                 raise HTTPException(
@@ -439,7 +526,7 @@ class BaseService(Generic[T]):
             projection: Campos a retornar (optimización)
             
         Returns:
-            Dict con items, total, skip y limit
+            Dict con items, total, skip, limit y next_cursor
         """
         try:
             query = self._build_filter_query(filters or {})
@@ -449,15 +536,29 @@ class BaseService(Generic[T]):
             sort_order = ASCENDING if pagination.sort_order == 1 else DESCENDING
             sort_by = pagination.sort_by or "_id"
             
-            cursor = self.collection.find(query, projection)
-            
-            if sort_by:
+            if pagination.after_id:
+                # Paginación por cursor: el índice de _id salta directo a la
+                # página, sin recorrer los documentos anteriores como skip
+                page_query = {
+                    **query,
+                    "_id": {"$gt": self._validate_object_id(pagination.after_id)}
+                }
+                cursor = self.collection.find(page_query, projection)
+                cursor = cursor.sort("_id", ASCENDING).limit(pagination.limit)
+                keyset = True
+            else:
+                cursor = self.collection.find(query, projection)
                 cursor = cursor.sort(sort_by, sort_order)
+                cursor = cursor.skip(pagination.skip).limit(pagination.limit)
+                keyset = sort_by == "_id" and sort_order == ASCENDING
             
-            cursor = cursor.skip(pagination.skip).limit(pagination.limit)
+            documents = await cursor.to_list()
+            total = await self.collection.count_documents(query)
             
-            documents = list(cursor)
-            total = self.collection.count_documents(query)
+            # Solo hay cursor si el orden es por _id ascendente y la página está llena
+            next_cursor = None
+            if keyset and documents and len(documents) == pagination.limit:
+                next_cursor = str(documents[-1]["_id"])
             
             items = []
             for doc in documents:
@@ -471,9 +572,12 @@ class BaseService(Generic[T]):
                 "items": items,
                 "total": total,
                 "skip": pagination.skip,
-                "limit": pagination.limit
+                "limit": pagination.limit,
+                "next_cursor": next_cursor
             }
             
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error obteniendo lista de {self.collection_name}: {e}")
             raise HTTPException(
@@ -481,6 +585,136 @@ class BaseService(Generic[T]):
                 detail=f"Error al obtener datos: {str(e)}"
             )
     
+    def _serialize_document(self, document: Dict[str, Any]) -> bytes:
+        """Valida un documento con el modelo y lo serializa a JSON."""
+        return self._document_to_model(document).model_dump_json(by_alias=True).encode()
+    
+    async def _first_chunk(self, cursor: AsyncCursor) -> Optional[bytes]:
+        """
+        Lee y serializa el primer documento de un cursor antes de empezar
+        a responder, para que los errores de consulta sigan siendo un 500.
+        
+        Args:
+            cursor: Cursor de MongoDB aún sin iterar
+            
+        Returns:
+            Primer documento serializado, o None si no hay resultados
+            
+        Raises:
+            HTTPException: Si la consulta o la validación fallan
+        """
+        try:
+            return self._serialize_document(await cursor.next())
+        except StopAsyncIteration:
+            await cursor.close()
+            return None
+        except Exception as e:
+            await cursor.close()
+            logger.error(f"Error iniciando streaming de {self.collection_name}: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error al obtener datos"
+            )
+    
+    async def stream_json_array(
+        self,
+        query: Dict[str, Any],
+        projection: Optional[Dict[str, int]] = None,
+        batch_size: int = 200
+    ) -> AsyncIterator[bytes]:
+        """
+        Prepara el resultado de una consulta como un array JSON serializado
+        documento a documento, para responder con StreamingResponse.
+        
+        Solo hay un documento en memoria a la vez: no se construye la lista
+        completa de modelos antes de serializar. El primer documento se lee
+        aquí, antes de empezar la respuesta.
+        
+        Args:
+            query: Query de MongoDB
+            projection: Campos a retornar (optimización)
+            batch_size: Documentos por lote del cursor
+            
+        Returns:
+            Iterador de fragmentos del array JSON
+            
+        Raises:
+            HTTPException: Si la consulta falla antes de empezar a enviar
+        """
+        cursor = self.collection.find(query, projection).batch_size(batch_size)
+        first = await self._first_chunk(cursor)
+        return self._json_array_chunks(cursor, first)
+    
+    async def _json_array_chunks(
+        self,
+        cursor: AsyncCursor,
+        first: Optional[bytes]
+    ) -> AsyncIterator[bytes]:
+        """
+        Emite el array JSON. Si MongoDB falla a mitad (la respuesta ya es un
+        200), se registra el error y el array se cierra igualmente.
+        """
+        yield b"["
+        try:
+            if first is not None:
+                yield first
+                async for document in cursor:
+                    yield b"," + self._serialize_document(document)
+        except Exception as e:
+            logger.error(f"Streaming de {self.collection_name} interrumpido: {e}")
+        finally:
+            await cursor.close()
+        yield b"]"
+    
+    async def stream_ndjson(
+        self,
+        query: Dict[str, Any],
+        projection: Optional[Dict[str, int]] = None,
+        limit: int = 0
+    ) -> AsyncIterator[bytes]:
+        """
+        Prepara el resultado de una consulta como NDJSON (un documento JSON
+        por línea), para responder con StreamingResponse.
+        
+        No se fija batch_size: el driver ya agrupa los lotes hasta 16 MiB.
+        El primer documento se lee aquí, antes de empezar la respuesta.
+        
+        Args:
+            query: Query de MongoDB
+            projection: Campos a retornar (optimización)
+            limit: Máximo de documentos (0 = sin límite)
+            
+        Returns:
+            Iterador de líneas NDJSON
+            
+        Raises:
+            HTTPException: Si la consulta falla antes de empezar a enviar
+        """
+        cursor = self.collection.find(query, projection, limit=limit)
+        first = await self._first_chunk(cursor)
+        return self._ndjson_lines(cursor, first)
+    
+    async def _ndjson_lines(
+        self,
+        cursor: AsyncCursor,
+        first: Optional[bytes]
+    ) -> AsyncIterator[bytes]:
+        """
+        Emite las líneas NDJSON. Si MongoDB falla a mitad, se registra el
+        error y se termina en la última línea completa.
+        """
+        if first is None:
+            return
+        
+        try:
+            yield first + b"\n"
+            async for document in cursor:
+                yield self._serialize_document(document) + b"\n"
+        except Exception as e:
+            logger.error(f"Streaming de {self.collection_name} interrumpido: {e}")
+        finally:
+            await cursor.close()
+    
     async def create(self, item_data: T) -> T:
         """
         Crea un nuevo documento.
@@ -498,9 +732,10 @@ class BaseService(Generic[T]):
                 exclude={"id"}
             )
             
-            result = self.collection.insert_one(document)
+            result = await self.collection.insert_one(document)
             
             document["_id"] = str(result.inserted_id)
+            await self._after_write(result.inserted_id)
             
             return self._document_to_model(document)
             
@@ -533,7 +768,7 @@ class BaseService(Generic[T]):
                     detail="No hay datos para actualizar"
                 )
             
-            result = self.collection.update_one(
+            result = await self.collection.update_one(
                 {"_id": obj_id},
                 {"$set": update_data}
             )
@@ -544,6 +779,7 @@ class BaseService(Generic[T]):
                     detail=f"{self.collection_name} con ID {item_id} no encontrado"
                 )
             
+            await self._after_write(obj_id)
             return await self.get_by_id(item_id)
             
         except HTTPException:
@@ -568,7 +804,7 @@ class BaseService(Generic[T]):
         obj_id = self._validate_object_id(item_id)
         
         try:
-            result = self.collection.delete_one({"_id": obj_id})
+            result = await self.collection.delete_one({"_id": obj_id})
             
             if result.deleted_count == 0:
                 raise HTTPException(
@@ -576,6 +812,7 @@ class BaseService(Generic[T]):
                     detail=f"{self.collection_name} con ID {item_id} no encontrado"
                 )
             
+            await self._after_write(obj_id)
             return {"message": f"{self.collection_name} eliminado exitosamente"}
             
         except HTTPException:
@@ -599,7 +836,7 @@ class BaseService(Generic[T]):
         """
         try:
             query = self._build_filter_query(filters or {})
-            return self.collection.count_documents(query)
+            return await self.collection.count_documents(query)
         except Exception as e:
             logger.error(f"Error contando {self.collection_name}: {e}")
             raise HTTPException(
@@ -620,7 +857,7 @@ class BaseService(Generic[T]):
         obj_id = self._validate_object_id(item_id)
         
         try:
-            count = self.collection.count_documents({"_id": obj_id}, limit=1)
+            count = await self.collection.count_documents({"_id": obj_id}, limit=1)
             return count > 0
         except Exception as e:
             logger.error(f"Error verificando existencia de {item_id}: {e}")
@@ -645,7 +882,8 @@ class BaseService(Generic[T]):
                 for item in items
             ]
             
-            result = self.collection.insert_many(documents, ordered=False)
+            result = await self.collection.insert_many(documents, ordered=False)
+            await self._after_write()
             
             return {
                 "inserted": len(result.inserted_ids),
@@ -659,18 +897,26 @@ class BaseService(Generic[T]):
                 detail="Error en creación masiva"
             )
     
-    async def aggregate(self, pipeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    async def aggregate(
+        self,
+        pipeline: List[Dict[str, Any]],
+        **options: Any
+    ) -> List[Dict[str, Any]]:
         """
         Ejecuta un pipeline de agregación de MongoDB.
         
         Args:
             pipeline: Pipeline de agregación de MongoDB
+            **options: Opciones del comando aggregate (p. ej. allowDiskUse=False
+                para pipelines pequeños, batchSize igual al tamaño esperado del
+                resultado para evitar getMore)
             
         Returns:
             Resultados de la agregación con ObjectIds limpiados
         """
         try:
-            results = list(self.collection.aggregate(pipeline))
+            cursor = await self.collection.aggregate(pipeline, **options)
+            results = await cursor.to_list()
             cleaned_results = [self._clean_objectids(result) for result in results]
             return cleaned_results
         except Exception as e:
@@ -1,8 +1,14 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
 from fastapi import HTTPException, status
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.asynchronous.collection import AsyncCollection
+import asyncio
 import logging
+import re
 
 from app.services.base_service import BaseService
+from app.database import MongoDB
 from app.models.bosses import (
     BossResponse,
     BossCreate,
@@ -15,16 +21,94 @@ from app.models.bosses import (
     SharebearerAnalysis
 )
 from app.models.base import PaginationParams
+from app.utils.cache import cached
 
 logger = logging.getLogger(__name__)
 
+# Patrones compilados una sola vez; PyMongo los serializa como regex BSON
+_GREAT_RUNE_RE = re.compile("Great Rune", re.IGNORECASE)
+_REMEMBRANCE_RE = re.compile("Remembrance", re.IGNORECASE)
+
+# Jefes con al menos un drop / sin drops (ausente, null o lista vacía)
+_HAS_DROPS_QUERY = {"drops": {"$exists": True, "$nin": [None, []]}}
+_NO_DROPS_QUERY = {"$or": [{"drops": {"$in": [None, []]}}, {"drops": {"$exists": False}}]}
+
+# Un documento por drop único con los jefes que lo sueltan (ver analyze_drops)
+_DROPS_PIPELINE = [
+    {"$match": _HAS_DROPS_QUERY},
+    {"$unwind": "$drops"},
+    {
+        "$group": {
+            "_id": "$drops",
+            "dropped_by": {"$push": "$name"},
+            "drop_count": {"$sum": 1}
+        }
+    },
+    {
+        "$project": {
+            "_id": 0,
+            "item_name": "$_id",
+            "dropped_by": 1,
+            "drop_count": 1
+        }
+    }
+]
+
 class BossService(BaseService[BossResponse]):
     """
     Servicio especializado para jefes con análisis de drops y regiones.
     """
     
+    # region va primero para que las consultas solo por región
+    # (stream_by_region, agrupación por región) usen el prefijo del compuesto
+    indexes = [
+        IndexModel([("region", ASCENDING), ("name", ASCENDING)]),
+        IndexModel([("name", ASCENDING)]),
+        # Multikey: stream_by_drop, filtros de drops y $elemMatch. Si el caso
+        # has_drops=True llega a dominar, un índice parcial con
+        # partialFilterExpression {"drops": {"$exists": True}} lo acelera.
+        IndexModel([("drops", ASCENDING)]),
+    ]
+    
+    # Colección auxiliar con un documento por drop único (ver analyze_drops)
+    drops_collection_name = "boss_drops_materialized"
+    
     def __init__(self):
         super().__init__("bosses", BossResponse)
+        self._drops_materialized = False
+    
+    @property
+    def drops_collection(self) -> AsyncCollection:
+        """Colección materializada de drops."""
+        return MongoDB.get_collection(self.drops_collection_name)
+    
+    async def _after_write(self, item_id: Optional[ObjectId] = None) -> None:
+        """Marca el análisis de drops como desactualizado e invalida la caché."""
+        # Se reconstruye al pedirlo de nuevo (ver analyze_drops)
+        self._drops_materialized = False
+        await super()._after_write(item_id)
+    
+    async def refresh_drops_materialized(self) -> None:
+        """
+        Reconstruye `boss_drops_materialized` con `$out`.
+        
+        Los jefes casi nunca cambian, así que el pipeline pesado
+        ($unwind + $group) se ejecuta una vez tras cada escritura, cuando
+        alguien pide analyze_drops, y el resto de llamadas son un find
+        ordenado. Si hubo una escritura mientras se reconstruía, la
+        colección no se da por válida.
+        """
+        generation = self._cache_generation
+        pipeline = _DROPS_PIPELINE + [{"$out": self.drops_collection_name}]
+        
+        try:
+            cursor = await self.collection.aggregate(pipeline)
+            await cursor.to_list()
+            await self.drops_collection.create_index([("drop_count", DESCENDING)])
+            self._drops_materialized = generation == self._cache_generation
+        except Exception as e:
+            self._drops_materialized = False
+            logger.warning(f"No se pudo materializar {self.drops_collection_name}: {e}")
     
     def _build_boss_filter_query(self, filters: BossFilterParams) -> Dict[str, Any]:
         """
@@ -52,34 +136,38 @@ class BossService(BaseService[BossResponse]):
         
         if filters.has_drops is not None:
             if filters.has_drops:
-                drop_conditions.append({"drops": {"$exists": True, "$ne": None, "$ne": []}})
+                drop_conditions.append(_HAS_DROPS_QUERY)
             else:
-                drop_conditions.append({"$or": [
-                    {"drops": {"$exists": False}},
-                    {"drops": None},
-                    {"drops": []}
-                ]})
+                drop_conditions.append(_NO_DROPS_QUERY)
         
         if filters.drop_item:
             drop_conditions.append({"drops": {"$regex": filters.drop_item, "$options": "i"}})
         
         if filters.has_remembrance is not None:
             if filters.has_remembrance:
-                drop_conditions.append({"drops": {"$elemMatch": {"$regex": "Remembrance", "$options": "i"}}})
+                drop_conditions.append({"drops": {"$elemMatch": {"$regex": _REMEMBRANCE_RE}}})
             else:
-                drop_conditions.append({"$not": {"$elemMatch": {"$regex": "Remembrance", "$options": "i"}}})
+                drop_conditions.append({"$not": {"$elemMatch": {"$regex": _REMEMBRANCE_RE}}})
         
         if filters.has_great_rune is not None:
             if filters.has_great_rune:
-                drop_conditions.append({"drops": {"$elemMatch": {"$regex": "Great Rune", "$options": "i"}}})
+                drop_conditions.append({"drops": {"$elemMatch": {"$regex": _GREAT_RUNE_RE}}})
             else:
-                drop_conditions.append({"$not": {"$elemMatch": {"$regex": "Great Rune", "$options": "i"}}})
+                drop_conditions.append({"$not": {"$elemMatch": {"$regex": _GREAT_RUNE_RE}}})
         
         if drop_conditions:
             query["$and"] = query.get("$and", []) + drop_conditions
         
         return query
     
+    def _region_query(self, region: str) -> Dict[str, Any]:
+        """Query de jefes de una región exacta (case-insensitive)."""
+        return {"region": {"$regex": f"^{region}$", "$options": "i"}}
+    
+    def _drop_query(self, item_name: str) -> Dict[str, Any]:
+        """Query de jefes que dropean un item."""
+        return {"drops": {"$regex": item_name, "$options": "i"}}
+    
     async def get_bosses(
         self,
         filters: Optional[BossFilterParams] = None,
@@ -103,6 +191,8 @@ class BossService(BaseService[BossResponse]):
             
             return await self.get_many(filters=query, pagination=pagination)
             
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error obteniendo jefes: {e}")
             raise HTTPException(
@@ -110,33 +200,12 @@ class BossService(BaseService[BossResponse]):
                 detail="Error al obtener jefes"
             )
     
-    async def get_by_region(self, region: str) -> List[BossResponse]:
-        """
-        Obtiene todos los jefes de una región específica.
-        
-        Args:
-            region: Nombre de la región
-            
-        Returns:
-            Lista de jefes en la región
-        """
-        try:
-            query = {"region": {"$regex": f"^{region}$", "$options": "i"}}
-            documents = list(self.collection.find(query))
-            
-            return [self._document_to_model(doc) for doc in documents]
-            
-        except Exception as e:
-            logger.error(f"Error obteniendo jefes de región {region}: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Error al obtener jefes por región"
-            )
-    
+    @cached()
     async def get_bosses_by_region_grouped(self) -> List[BossByRegionResponse]:
         """
         Agrupa jefes por región con conteo.
-        Optimizado con agregación de MongoDB.
+        Optimizado con agregación de MongoDB: devuelve columnas
+        (ids, nombres, imágenes, drops) en lugar de documentos completos.
         
         Returns:
             Jefes agrupados por región
@@ -151,7 +220,18 @@ class BossService(BaseService[BossResponse]):
                 {
                     "$group": {
                         "_id": "$region",
-                        "bosses": {"$push": "$ROOT"},
+                        "ids": {"$push": "$_id"},
+                        "names": {"$push": "$name"},
+                        "images": {"$push": {"$ifNull": ["$image", None]}},
+                        "drop_counts": {
+                            "$push": {
+                                "$cond": [
+                                    {"$isArray": "$drops"},
+                                    {"$size": "$drops"},
+                                    0
+                                ]
+                            }
+                        },
                         "count": {"$sum": 1}
                     }
                 },
@@ -160,18 +240,17 @@ class BossService(BaseService[BossResponse]):
             
             results = await self.aggregate(pipeline)
             
-            grouped = []
-            for result in results:
-                bosses = [self._document_to_model(b) for b in result["bosses"]]
-                grouped.append(
-                    BossByRegionResponse(
-                        region=result["_id"],
-                        boss_count=result["count"],
-                        bosses=bosses
-                    )
+            return [
+                BossByRegionResponse(
+                    region=result["_id"],
+                    boss_count=result["count"],
+                    ids=result["ids"],
+                    names=result["names"],
+                    images=result["images"],
+                    drop_counts=result["drop_counts"]
                 )
-            
-            return grouped
+                for result in results
+            ]
             
         except Exception as e:
             logger.error(f"Error agrupando jefes por región: {e}")
@@ -205,9 +284,8 @@ class BossService(BaseService[BossResponse]):
                                                             "as": "drop",
                                                             "cond": {
                                                                 "$regexMatch": {
-                                                                    "input": "$drop",
-                                                                    "regex": "Great Rune",
-                                                                    "options": "i"
+                                                                    "input": "$$drop",
+                                                                    "regex": _GREAT_RUNE_RE
                                                                 }
                                                             }
                                                         }
@@ -236,9 +314,8 @@ class BossService(BaseService[BossResponse]):
                                                             "as": "drop",
                                                             "cond": {
                                                                 "$regexMatch": {
-                                                                    "input": "$drop",
-                                                                    "regex": "Remembrance",
-                                                                    "options": "i"
+                                                                    "input": "$$drop",
+                                                                    "regex": _REMEMBRANCE_RE
                                                                 }
                                                             }
                                                         }
@@ -275,26 +352,36 @@ class BossService(BaseService[BossResponse]):
                 {
                     "$group": {
                         "_id": "$tier",
-                        "bosses": {"$push": "$ROOT"},
+                        "bosses": {"$push": "$$ROOT"},
                         "count": {"$sum": 1},
                         "total_drops": {"$sum": {"$size": {"$ifNull": ["$drops", []]}}}
                     }
                 },
+                {
+                    "$addFields": {
+                        "tier_rank": {
+                            "$switch": {
+                                "branches": [
+                                    {"case": {"$eq": ["$_id", "Legendary"]}, "then": 0},
+                                    {"case": {"$eq": ["$_id", "Major"]}, "then": 1}
+                                ],
+                                "default": 2
+                            }
+                        }
+                    }
+                },
                 {
                     "$sort": {
-                        "_id": 1
+                        "tier_rank": 1
                     }
                 }
             ]
             
             results = await self.aggregate(pipeline)
             
-            tier_order = {"Legendary": 0, "Major": 1, "Minor": 2}
-            results.sort(key=lambda x: tier_order.get(x["_id"], 3))
-            
             grouped = []
             for result in results:
-                bosses = [self._document_to_model(b) for b in result["bosses"]]
+                bosses = self._documents_to_models(result["bosses"])
                 grouped.append(
                     BossByTierResponse(
                         tier=result["_id"],
@@ -313,42 +400,36 @@ class BossService(BaseService[BossResponse]):
                 detail="Error al agrupar jefes por tier"
             )
     
+    @cached()
     async def analyze_drops(self) -> List[BossDropAnalysis]:
         """
         Analiza qué items dropean los jefes.
         Muestra qué jefes dropean cada item único.
         
+        Lee de la colección materializada `boss_drops_materialized`, que se
+        construye en la primera llamada tras arrancar o tras una escritura.
+        Si no se puede materializar, ejecuta la agregación directamente.
+        
         Returns:
             Análisis de drops
         """
         try:
-            pipeline = [
-                {
-                    "$match": {
-                        "drops": {"$exists": True, "$ne": None, "$ne": []}
-                    }
-                },
-                {"$unwind": "$drops"},
-                {
-                    "$group": {
-                        "_id": "$drops",
-                        "dropped_by": {"$push": "$name"},
-                        "drop_count": {"$sum": 1}
-                    }
-                },
-                {"$sort": {"drop_count": -1}}
-            ]
-            
-            results = await self.aggregate(pipeline)
-            
-            return [
-                BossDropAnalysis(
-                    item_name=result["_id"],
-                    dropped_by=result["dropped_by"],
-                    drop_count=result["drop_count"]
+            if not self._drops_materialized:
+                await self.refresh_drops_materialized()
+            
+            if self._drops_materialized:
+                results = await (
+                    self.drops_collection
+                    .find({}, {"_id": 0})
+                    .sort("drop_count", DESCENDING)
+                    .to_list()
                 )
-                for result in results
-            ]
+            else:
+                results = await self.aggregate(
+                    _DROPS_PIPELINE + [{"$sort": {"drop_count": -1}}]
+                )
+            
+            return [BossDropAnalysis(**result) for result in results]
             
         except Exception as e:
             logger.error(f"Error analizando drops: {e}")
@@ -357,41 +438,56 @@ class BossService(BaseService[BossResponse]):
                 detail="Error al analizar drops"
             )
     
-    async def get_shardbearers(self) -> SharebearerAnalysis:
+    async def get_shardbearers(self, include_bosses: bool = False) -> SharebearerAnalysis:
         """
         Obtiene análisis de Shardbearers (jefes con Gran Runa).
         Jefes obligatorios para completar el juego.
-        
+
+        Las Grandes Runas y las regiones se calculan en una sola agregación
+        de MongoDB; los documentos completos solo se cargan si se piden.
+
+        Args:
+            include_bosses: Incluir la lista completa de Shardbearers
+                (consulta adicional; desactivado por defecto)
+
         Returns:
             Análisis de Shardbearers
         """
         try:
             query = {
                 "drops": {
-                    "$elemMatch": {"$regex": "Great Rune", "$options": "i"}
+                    "$elemMatch": {"$regex": _GREAT_RUNE_RE}
                 }
             }
-            
-            documents = list(self.collection.find(query))
-            shardbearers = [self._document_to_model(doc) for doc in documents]
-            
-            great_runes = []
-            regions = set()
-            
-            for boss in shardbearers:
-                if boss.drops:
-                    for drop in boss.drops:
-                        if "Great Rune" in drop:
-                            great_runes.append(drop)
-                
-                if boss.region:
-                    regions.add(boss.region)
-            
+
+            pipeline = [
+                {"$match": query},
+                {"$unwind": "$drops"},
+                {"$match": {"drops": _GREAT_RUNE_RE}},
+                {
+                    "$group": {
+                        "_id": None,
+                        "great_runes": {"$push": "$drops"},
+                        "regions": {"$addToSet": "$region"}
+                    }
+                }
+            ]
+
+            results = await self.aggregate(pipeline)
+            summary = results[0] if results else {"great_runes": [], "regions": []}
+
+            total_shardbearers = await self.collection.count_documents(query)
+
+            shardbearers = []
+            if include_bosses:
+                documents = await self.collection.find(query).to_list()
+                shardbearers = self._documents_to_models(documents)
+
             return SharebearerAnalysis(
-                total_shardbearers=len(shardbearers),
+                total_shardbearers=total_shardbearers,
                 shardbearers=shardbearers,
-                great_runes=great_runes,
-                regions_with_shardbearers=list(regions)
+                great_runes=summary["great_runes"],
+                regions_with_shardbearers=[r for r in summary["regions"] if r]
             )
             
         except Exception as e:
@@ -401,6 +497,7 @@ class BossService(BaseService[BossResponse]):
                 detail="Error al obtener shardbearers"
             )
     
+    @cached()
     async def get_statistics(self) -> BossStatistics:
         """
         Obtiene estadísticas generales de jefes.
@@ -409,68 +506,59 @@ class BossService(BaseService[BossResponse]):
             Estadísticas agregadas
         """
         try:
-            pipeline = [
+            by_region_pipeline = [
                 {
-                    "$facet": {
-                        "total": [
-                            {"$count": "count"}
-                        ],
-                        "by_region": [
-                            {
-                                "$match": {
-                                    "region": {"$exists": True, "$ne": None}
-                                }
-                            },
-                            {
-                                "$group": {
-                                    "_id": "$region",
-                                    "count": {"$sum": 1}
+                    "$match": {
+                        "region": {"$exists": True, "$ne": None}
+                    }
+                },
+                {
+                    "$group": {
+                        "_id": "$region",
+                        "count": {"$sum": 1}
+                    }
+                }
+            ]
+            
+            # Unión de conjuntos sobre los arrays de drops,
+            # sin $unwind (no multiplica documentos)
+            unique_drops_pipeline = [
+                {"$match": {"drops": {"$type": "array"}}},
+                {
+                    "$group": {
+                        "_id": None,
+                        "all": {"$push": "$drops"}
+                    }
+                },
+                {
+                    "$project": {
+                        "count": {
+                            "$size": {
+                                "$reduce": {
+                                    "input": "$all",
+                                    "initialValue": [],
+                                    "in": {"$setUnion": ["$$value", "$$this"]}
                                 }
                             }
-                        ],
-                        "with_drops": [
-                            {
-                                "$match": {
-                                    "drops": {"$exists": True, "$ne": None, "$ne": []}
-                                }
-                            },
-                            {"$count": "count"}
-                        ],
-                        "unique_drops": [
-                            {
-                                "$match": {
-                                    "drops": {"$exists": True, "$ne": None, "$ne": []}
-                                }
-                            },
-                            {"$unwind": "$drops"},
-                            {
-                                "$group": {
-                                    "_id": "$drops"
-                                }
-                            },
-                            {"$count": "count"}
-                        ]
+                        }
                     }
                 }
             ]
             
-            results = await self.aggregate(pipeline)
-            
-            if not results:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="No se encontraron datos"
-                )
-            
-            result = results[0]
+            # Los conteos usan el índice de drops; solo la distribución por
+            # región y los drops únicos necesitan agregación
+            total_bosses, bosses_with_drops, by_region_results, unique_results = await asyncio.gather(
+                self.collection.count_documents({}),
+                self.collection.count_documents(_HAS_DROPS_QUERY),
+                self.aggregate(by_region_pipeline),
+                self.aggregate(unique_drops_pipeline)
+            )
             
-            total_bosses = result["total"][0]["count"] if result["total"] else 0
-            bosses_with_drops = result["with_drops"][0]["count"] if result["with_drops"] else 0
-            unique_drops = result["unique_drops"][0]["count"] if result["unique_drops"] else 0
+            unique_drops = unique_results[0]["count"] if unique_results else 0
             
             by_region = {
                 r["_id"]: r["count"] 
-                for r in result["by_region"]
+                for r in by_region_results
             }
             
             return BossStatistics(
@@ -490,30 +578,34 @@ class BossService(BaseService[BossResponse]):
                 detail="Error al calcular estadísticas"
             )
     
-    async def search_by_drop(self, item_name: str) -> List[BossResponse]:
+    async def stream_by_region(self, region: str) -> AsyncIterator[bytes]:
         """
-        Busca jefes que dropean un item específico.
+        Jefes de una región, en streaming.
         
         Args:
-            item_name: Nombre del item a buscar
+            region: Nombre de la región
             
         Returns:
-            Lista de jefes que dropean el item
-        """
-        try:
-            query = {
-                "drops": {"$regex": item_name, "$options": "i"}
-            }
+            Iterador de fragmentos JSON para StreamingResponse
             
-            documents = list(self.collection.find(query))
+        Raises:
+            HTTPException: Si la consulta falla antes de empezar a enviar
+        """
+        return await self.stream_json_array(self._region_query(region))
+    
+    async def stream_by_drop(self, item_name: str) -> AsyncIterator[bytes]:
+        """
+        Jefes que dropean un item, en streaming.
+        
+        Args:
+            item_name: Nombre del item a buscar
             
-            return [self._document_to_model(doc) for doc in documents]
+        Returns:
+            Iterador de fragmentos JSON para StreamingResponse
             
-        except Exception as e:
-            logger.error(f"Error buscando jefes por drop {item_name}: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Error al buscar jefes por drop"
-            )
+        Raises:
+            HTTPException: Si la consulta falla antes de empezar a enviar
+        """
+        return await self.stream_json_array(self._drop_query(item_name))
 
 boss_service = BossService()
\ No newline at end of file
@@ -1,5 +1,9 @@
 from typing import List, Dict, Any, Optional
 from fastapi import HTTPException, status
+from bson import ObjectId
+from pymongo import ASCENDING, IndexModel, UpdateOne
+from types import MappingProxyType
+import copy
 import logging
 
 from app.services.base_service import BaseService
@@ -12,16 +16,190 @@ from app.models.classes import (
     BuildRecommendation
 )
 from app.models.base import PaginationParams
+from app.utils.cache import cached
 
 logger = logging.getLogger(__name__)
 
+# Campos necesarios para puntuar clases (evita traer documentos completos)
+_SCORING_PROJECTION = {"name": 1, "archetype": 1, "stats": 1}
+
+# Atributos que suman en CharacterStats.total_stats (sin el nivel)
+_BASE_STATS = (
+    "vigor", "mind", "endurance", "strength",
+    "dexterity", "intelligence", "faith", "arcane"
+)
+
+# Stats prioritarias por tipo de build, de mayor a menor importancia
+_STAT_PRIORITIES = MappingProxyType({
+    "strength": ("strength", "vigor", "endurance"),
+    "dexterity": ("dexterity", "vigor", "endurance"),
+    "quality": ("strength", "dexterity", "vigor"),
+    "intelligence": ("intelligence", "mind", "vigor"),
+    "faith": ("faith", "mind", "vigor"),
+    "sorcerer": ("intelligence", "mind", "vigor"),
+    "cleric": ("faith", "mind", "vigor"),
+    "arcane": ("arcane", "mind", "vigor"),
+    "tank": ("vigor", "endurance", "strength"),
+    "glass_cannon": ("intelligence", "faith", "arcane")
+})
+
+# Pares (stat, peso) para puntuar: la primera stat pesa más
+_STAT_PRIORITIES_WEIGHTED = MappingProxyType({
+    build: tuple((stat, len(stats) - i) for i, stat in enumerate(stats))
+    for build, stats in _STAT_PRIORITIES.items()
+})
+
+
+def _score_expression(weighted_stats) -> Dict[str, Any]:
+    """Expresión de agregación: suma ponderada de stats menos medio nivel."""
+    return {
+        "$subtract": [
+            {
+                "$add": [
+                    {"$multiply": [{"$ifNull": [f"$stats.{stat}", 0]}, weight]}
+                    for stat, weight in weighted_stats
+                ]
+            },
+            {"$multiply": [{"$ifNull": ["$stats.level", 1]}, 0.5]}
+        ]
+    }
+
+
+# Expresiones de puntuación por build, construidas una sola vez
+_SCORE_EXPRESSIONS = MappingProxyType({
+    build: _score_expression(weighted)
+    for build, weighted in _STAT_PRIORITIES_WEIGHTED.items()
+})
+
+# Recomendaciones por arquetipo (ver get_build_recommendation)
+_WEAPON_RECOMMENDATIONS = MappingProxyType({
+    "Strength": ("Greatsword", "Colossal Sword", "Great Hammer"),
+    "Dexterity": ("Katana", "Curved Sword", "Spear"),
+    "Quality": ("Straight Sword", "Greatsword", "Halberd"),
+    "Sorcerer": ("Staff", "Glintstone Staff"),
+    "Cleric": ("Sacred Seal", "Cipher Pata"),
+    "Occult": ("Occult Weapon", "Reduvia"),
+    "Tank": ("Greatshield", "Lance"),
+    "Hybrid": ("Quality Weapon", "Faith/Int Weapon")
+})
+
+_SPELL_RECOMMENDATIONS = MappingProxyType({
+    "Sorcerer": ("Glintstone Pebble", "Rock Sling", "Comet Azur"),
+    "Cleric": ("Heal", "Lightning Spear", "Black Flame"),
+    "Occult": ("Bloodflame Blade", "Dragon Communion")
+})
+
+_STAT_PRIORITY_BY_ARCHETYPE = MappingProxyType({
+    "Strength": ("Vigor", "Endurance", "Strength"),
+    "Dexterity": ("Vigor", "Endurance", "Dexterity"),
+    "Quality": ("Vigor", "Strength", "Dexterity"),
+    "Sorcerer": ("Mind", "Intelligence", "Vigor"),
+    "Cleric": ("Mind", "Faith", "Vigor"),
+    "Occult": ("Arcane", "Mind", "Vigor"),
+    "Tank": ("Vigor", "Endurance", "Strength"),
+    "Hybrid": ("Vigor", "Mind", "Primary Stats")
+})
+
+_PLAYSTYLE_GUIDE = MappingProxyType({
+    "Strength": "Build enfocado en armas pesadas y daño físico alto. Prioriza armadura pesada y resistencia.",
+    "Dexterity": "Build ágil con armas rápidas. Enfócate en esquivar y ataques críticos.",
+    "Quality": "Build versátil que usa STR y DEX. Acceso a más opciones de armas.",
+    "Sorcerer": "Build de hechicero con magia ofensiva. Mantén distancia y usa hechizos poderosos.",
+    "Cleric": "Build de fe con incantaciones. Balance entre daño y soporte.",
+    "Occult": "Build basado en arcano. Efectos de estado y sangrado.",
+    "Tank": "Build defensivo con HP alto y armadura pesada.",
+    "Hybrid": "Build mixto con múltiples opciones de combate."
+})
+
 class ClassService(BaseService[ClassResponse]):
     """
     Servicio especializado para clases con análisis de builds y comparaciones.
     """
     
+    # archetype se persiste (ver _sync_archetypes) para filtrar por igualdad;
+    # el compuesto cubre también archetype solo por prefijo
+    indexes = [
+        IndexModel([("archetype", ASCENDING), ("stats.level", ASCENDING)]),
+        IndexModel([("stats.level", ASCENDING)]),
+        IndexModel([("stats.strength", ASCENDING)]),
+        IndexModel([("stats.intelligence", ASCENDING)]),
+        IndexModel([("stats.faith", ASCENDING)]),
+    ]
+    
     def __init__(self):
         super().__init__("classes", ClassResponse)
+        # Copia en memoria de todas las clases (ver reload_snapshot)
+        self._snapshot_models: Optional[List[ClassResponse]] = None
+        self._snapshot_by_id: Dict[str, ClassResponse] = {}
+    
+    async def startup(self) -> None:
+        """Crea índices, persiste arquetipos y carga la copia en memoria."""
+        await super().startup()
+        await self._sync_archetypes()
+        await self.reload_snapshot()
+    
+    async def _after_write(self, item_id: Optional[ObjectId] = None) -> None:
+        """Recalcula arquetipos, recarga la copia en memoria e invalida la caché."""
+        # La caché se vacía al final: una lectura intermedia no debe cachear datos viejos
+        await self._sync_archetypes()
+        await self.reload_snapshot()
+        await super()._after_write(item_id)
+    
+    async def reload_snapshot(self) -> None:
+        """
+        Carga todas las clases en memoria.
+        
+        Las clases iniciales son pocas y solo cambian por escrituras de
+        administración, así que las consultas por arquetipo o por ID se
+        resuelven sin ir a MongoDB.
+        """
+        try:
+            documents = await self.collection.find({}).to_list()
+            models = self._documents_to_models(documents)
+            self._snapshot_models = models
+            self._snapshot_by_id = {model.id: model for model in models}
+            logger.info(f"Copia en memoria de clases cargada: {len(models)} clases")
+        except Exception as e:
+            self._snapshot_models = None
+            self._snapshot_by_id = {}
+            logger.warning(f"No se pudo cargar la copia en memoria de clases: {e}")
+    
+    async def _get_snapshot(self) -> List[ClassResponse]:
+        """Retorna la copia en memoria, cargándola si aún no existe."""
+        if self._snapshot_models is None:
+            await self.reload_snapshot()
+            if self._snapshot_models is None:
+                raise RuntimeError("Copia en memoria de clases no disponible")
+        return self._snapshot_models
+    
+    async def _sync_archetypes(self) -> None:
+        """
+        Guarda en cada documento el arquetipo calculado por el modelo.
+        
+        El arquetipo depende de las stats, así que se deriva con
+        ClassBase.archetype y solo se escriben los documentos que cambian.
+        De este modo los filtros por arquetipo son coincidencias exactas
+        que pueden usar el índice.
+        """
+        try:
+            documents = await self.collection.find(
+                {}, {"name": 1, "stats": 1, "archetype": 1}
+            ).to_list()
+            
+            operations = []
+            for doc in documents:
+                stored = doc.get("archetype")
+                archetype = self._document_to_model(doc).archetype
+                if stored != archetype:
+                    operations.append(
+                        UpdateOne({"_id": doc["_id"]}, {"$set": {"archetype": archetype}})
+                    )
+            
+            if operations:
+                await self.collection.bulk_write(operations)
+                logger.info(f"Arquetipos actualizados en {len(operations)} clases")
+        except Exception as e:
+            logger.warning(f"No se pudieron sincronizar arquetipos de clases: {e}")
     
     def _build_class_filter_query(self, filters: ClassFilterParams) -> Dict[str, Any]:
         """
@@ -57,9 +235,8 @@ class ClassService(BaseService[ClassResponse]):
             query["stats.faith"] = {"$gte": filters.min_faith}
         
         if filters.archetype:
-            # Asumiendo que el campo 'archetype' existe en el documento de MongoDB
-            # y que queremos una búsqueda case-insensitive
-            query["archetype"] = {"$regex": filters.archetype, "$options": "i"}
+            # Igualdad exacta sobre el arquetipo persistido (indexado)
+            query["archetype"] = filters.archetype.strip().title()
         
         return query
     
@@ -86,6 +263,8 @@ class ClassService(BaseService[ClassResponse]):
             
             return await self.get_many(filters=query, pagination=pagination)
             
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error obteniendo clases: {e}")
             raise HTTPException(
@@ -120,11 +299,8 @@ class ClassService(BaseService[ClassResponse]):
                     detail=f"Arquetipo inválido. Opciones: {', '.join(valid_archetypes)}"
                 )
             
-            # Realizar el filtrado a nivel de base de datos
-            query = {"archetype": {"$regex": archetype, "$options": "i"}}
-            documents = list(self.collection.find(query))
-            
-            return [self._document_to_model(doc) for doc in documents]
+            snapshot = await self._get_snapshot()
+            return [c for c in snapshot if c.archetype == archetype]
             
         except HTTPException:
             raise
@@ -149,50 +325,81 @@ class ClassService(BaseService[ClassResponse]):
             Análisis comparativo completo
         """
         try:
-            from bson import ObjectId
-            
             class_ids = [
                 self._validate_object_id(cid) for cid in comparison.class_ids
             ]
             
-            classes = list(self.collection.find({"_id": {"$in": class_ids}}))
+            # MongoDB añade las stats pedidas y el total ya calculado; el
+            # documento completo se valida después como ClassResponse
+            pipeline = [
+                {"$match": {"_id": {"$in": class_ids}}},
+                {
+                    "$addFields": {
+                        "has_stats": {"$eq": [{"$type": "$stats"}, "object"]},
+                        "compared": {
+                            stat: f"$stats.{stat}" for stat in comparison.compare_stats
+                        },
+                        "total": {
+                            "$add": [
+                                {"$ifNull": [f"$stats.{stat}", 0]} for stat in _BASE_STATS
+                            ]
+                        }
+                    }
+                }
+            ]
             
-            if len(classes) != len(class_ids):
+            documents = await self.aggregate(pipeline)
+            by_id = {doc["_id"]: doc for doc in documents}
+            
+            if len(by_id) != len(class_ids):
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Una o más clases no encontradas"
                 )
             
-            classes_models = [self._document_to_model(c) for c in classes]
+            # En el orden de la petición; los campos calculados se separan antes
+            # de validar y arman la tabla de comparación y los totales
+            ordered = [by_id[str(class_id)] for class_id in class_ids]
+            computed = [
+                (doc.pop("compared", None) or {}, doc.pop("total"), doc.pop("has_stats"))
+                for doc in ordered
+            ]
+            classes = self._documents_to_models(ordered)
             
-            stats_comparison = {}
-            for stat in comparison.compare_stats:
-                stats_comparison[stat] = {}
-                for class_model in classes_models:
-                    if class_model.stats:
-                        stat_value = getattr(class_model.stats, stat, None)
-                        stats_comparison[stat][class_model.name] = stat_value
+            stats_comparison = {stat: {} for stat in comparison.compare_stats}
+            total_stats = {}
+            archetypes = {}
+            for class_model, (compared, total, has_stats) in zip(classes, computed):
+                name = class_model.name
+                archetypes[name] = class_model.archetype
+                
+                if not has_stats:
+                    continue
+                
+                for stat, values in stats_comparison.items():
+                    values[name] = compared.get(stat)
+                total_stats[name] = total
             
+            # Se ignoran los valores None: si ninguna clase tiene la stat,
+            # no hay "mejor" para ella
             best_per_stat = {}
             for stat, values in stats_comparison.items():
-                if values:
-                    best_class = max(values.items(), key=lambda x: x[1] if x[1] else 0)
-                    best_per_stat[stat] = best_class[0]
-            
-            total_stats = {}
-            for class_model in classes_models:
-                if class_model.stats:
-                    total_stats[class_model.name] = class_model.stats.total_stats
+                best_name, best_value = None, float("-inf")
+                for name, value in values.items():
+                    if value is not None and value > best_value:
+                        best_name, best_value = name, value
+                if best_name is not None:
+                    best_per_stat[stat] = best_name
             
             most_versatile = max(total_stats.items(), key=lambda x: x[1])[0] if total_stats else None
             
             return {
-                "classes": classes_models,
+                "classes": classes,
                 "stats_comparison": stats_comparison,
                 "best_per_stat": best_per_stat,
                 "total_stats": total_stats,
                 "most_versatile": most_versatile,
-                "archetypes": {c.name: c.archetype for c in classes_models}
+                "archetypes": archetypes
             }
             
         except HTTPException:
@@ -204,6 +411,37 @@ class ClassService(BaseService[ClassResponse]):
                 detail="Error en comparación de clases"
             )
     
+    @cached()
+    async def _rank_all_build_types(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Puntúa todas las clases para cada tipo de build en una sola agregación.
+        
+        Cada rama del $facet aplica la expresión de puntuación de un build
+        y conserva las 4 mejores clases, de modo que una sola ida a MongoDB
+        resuelve las recomendaciones de todos los builds.
+        
+        Returns:
+            Diccionario build_type -> 4 mejores documentos con `_score`
+        """
+        pipeline = [
+            {"$match": {"stats": {"$type": "object"}}},
+            {"$project": _SCORING_PROJECTION},
+            {
+                "$facet": {
+                    build_type: [
+                        {"$addFields": {"_score": expression}},
+                        {"$sort": {"_score": -1, "_id": 1}},
+                        {"$limit": 4}
+                    ]
+                    for build_type, expression in _SCORE_EXPRESSIONS.items()
+                }
+            }
+        ]
+        
+        results = await self.aggregate(pipeline)
+        return results[0] if results else {}
+    
+    @cached()
     async def get_best_starting_class(
         self,
         build_type: str
@@ -220,57 +458,37 @@ class ClassService(BaseService[ClassResponse]):
         try:
             build_type = build_type.lower()
             
-            stat_priorities = {
-                "strength": ["strength", "vigor", "endurance"],
-                "dexterity": ["dexterity", "vigor", "endurance"],
-                "quality": ["strength", "dexterity", "vigor"],
-                "intelligence": ["intelligence", "mind", "vigor"],
-                "faith": ["faith", "mind", "vigor"],
-                "sorcerer": ["intelligence", "mind", "vigor"],
-                "cleric": ["faith", "mind", "vigor"],
-                "arcane": ["arcane", "mind", "vigor"],
-                "tank": ["vigor", "endurance", "strength"],
-                "glass_cannon": ["intelligence", "faith", "arcane"]
-            }
-            
-            if build_type not in stat_priorities:
+            if build_type not in _STAT_PRIORITIES:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Build type inválido. Opciones: {', '.join(stat_priorities.keys())}"
+                    detail=f"Build type inválido. Opciones: {', '.join(_STAT_PRIORITIES.keys())}"
                 )
             
-            priority_stats = stat_priorities[build_type]
+            priority_stats = list(_STAT_PRIORITIES[build_type])
+            weighted_stats = _STAT_PRIORITIES_WEIGHTED[build_type]
             
-            documents = list(self.collection.find({}))
-            classes_models = [self._document_to_model(doc) for doc in documents]
+            # Ranking precalculado para todos los builds (ver _rank_all_build_types);
+            # se copia porque el resultado está en caché
+            rankings = await self._rank_all_build_types()
+            documents = copy.deepcopy(rankings.get(build_type, []))
+            
+            scores = [doc.pop("_score") for doc in documents]
+            classes_models = self._documents_to_models(documents)
             
             scored_classes = []
-            for class_model in classes_models:
-                if not class_model.stats:
-                    continue
-                
-                score = 0
-                stat_details = {}
-                
-                for i, stat in enumerate(priority_stats):
-                    weight = len(priority_stats) - i
-                    stat_value = getattr(class_model.stats, stat, 0) or 0
-                    score += stat_value * weight
-                    stat_details[stat] = stat_value
-                
-                starting_level = class_model.stats.level or 1
-                score -= starting_level * 0.5
+            for score, class_model in zip(scores, classes_models):
+                stats = class_model.stats
                 
                 scored_classes.append({
                     "class": class_model,
                     "score": score,
-                    "starting_level": starting_level,
-                    "priority_stats": stat_details,
+                    "starting_level": stats.level or 1,
+                    "priority_stats": {
+                        stat: getattr(stats, stat, 0) or 0 for stat, _ in weighted_stats
+                    },
                     "archetype": class_model.archetype
                 })
             
-            scored_classes.sort(key=lambda x: x["score"], reverse=True)
-            
             best_class = scored_classes[0] if scored_classes else None
             alternatives = scored_classes[1:4] if len(scored_classes) > 1 else []
             
@@ -294,6 +512,7 @@ class ClassService(BaseService[ClassResponse]):
                 detail="Error al recomendar clase"
             )
     
+    @cached()
     async def get_stat_distribution(self) -> Dict[str, Any]:
         """
         Analiza la distribución de estadísticas entre todas las clases.
@@ -303,44 +522,30 @@ class ClassService(BaseService[ClassResponse]):
         """
         try:
             pipeline = [
-                {
-                    "$project": {
-                        "name": 1,
-                        "vigor": "$stats.vigor",
-                        "mind": "$stats.mind",
-                        "endurance": "$stats.endurance",
-                        "strength": "$stats.strength",
-                        "dexterity": "$stats.dexterity",
-                        "intelligence": "$stats.intelligence",
-                        "faith": "$stats.faith",
-                        "arcane": "$stats.arcane",
-                        "level": "$stats.level"
-                    }
-                },
                 {
                     "$group": {
                         "_id": None,
-                        "avg_vigor": {"$avg": "$vigor"},
-                        "avg_mind": {"$avg": "$mind"},
-                        "avg_endurance": {"$avg": "$endurance"},
-                        "avg_strength": {"$avg": "$strength"},
-                        "avg_dexterity": {"$avg": "$dexterity"},
-                        "avg_intelligence": {"$avg": "$intelligence"},
-                        "avg_faith": {"$avg": "$faith"},
-                        "avg_arcane": {"$avg": "$arcane"},
-                        "avg_level": {"$avg": "$level"},
-                        "max_vigor": {"$max": "$vigor"},
-                        "max_mind": {"$max": "$mind"},
-                        "max_strength": {"$max": "$strength"},
-                        "max_dexterity": {"$max": "$dexterity"},
-                        "max_intelligence": {"$max": "$intelligence"},
-                        "max_faith": {"$max": "$faith"},
-                        "min_vigor": {"$min": "$vigor"},
-                        "min_mind": {"$min": "$mind"},
-                        "min_strength": {"$min": "$strength"},
-                        "min_dexterity": {"$min": "$dexterity"},
-                        "min_intelligence": {"$min": "$intelligence"},
-                        "min_faith": {"$min": "$faith"}
+                        "avg_vigor": {"$avg": "$stats.vigor"},
+                        "avg_mind": {"$avg": "$stats.mind"},
+                        "avg_endurance": {"$avg": "$stats.endurance"},
+                        "avg_strength": {"$avg": "$stats.strength"},
+                        "avg_dexterity": {"$avg": "$stats.dexterity"},
+                        "avg_intelligence": {"$avg": "$stats.intelligence"},
+                        "avg_faith": {"$avg": "$stats.faith"},
+                        "avg_arcane": {"$avg": "$stats.arcane"},
+                        "avg_level": {"$avg": "$stats.level"},
+                        "max_vigor": {"$max": "$stats.vigor"},
+                        "max_mind": {"$max": "$stats.mind"},
+                        "max_strength": {"$max": "$stats.strength"},
+                        "max_dexterity": {"$max": "$stats.dexterity"},
+                        "max_intelligence": {"$max": "$stats.intelligence"},
+                        "max_faith": {"$max": "$stats.faith"},
+                        "min_vigor": {"$min": "$stats.vigor"},
+                        "min_mind": {"$min": "$stats.mind"},
+                        "min_strength": {"$min": "$stats.strength"},
+                        "min_dexterity": {"$min": "$stats.dexterity"},
+                        "min_intelligence": {"$min": "$stats.intelligence"},
+                        "min_faith": {"$min": "$stats.faith"}
                     }
                 }
             ]
@@ -380,7 +585,9 @@ class ClassService(BaseService[ClassResponse]):
             Recomendaciones de armas, hechizos y stats
         """
         try:
-            class_model = await self.get_by_id(class_id)
+            class_model = self._snapshot_by_id.get(class_id)
+            if class_model is None:
+                class_model = await self.get_by_id(class_id)
             
             if not class_model.stats:
                 raise HTTPException(
@@ -391,51 +598,12 @@ class ClassService(BaseService[ClassResponse]):
             primary_stats = class_model.primary_stats
             archetype = class_model.archetype
             
-            weapon_recommendations = {
-                "Strength": ["Greatsword", "Colossal Sword", "Great Hammer"],
-                "Dexterity": ["Katana", "Curved Sword", "Spear"],
-                "Quality": ["Straight Sword", "Greatsword", "Halberd"],
-                "Sorcerer": ["Staff", "Glintstone Staff"],
-                "Cleric": ["Sacred Seal", "Cipher Pata"],
-                "Occult": ["Occult Weapon", "Reduvia"],
-                "Tank": ["Greatshield", "Lance"],
-                "Hybrid": ["Quality Weapon", "Faith/Int Weapon"]
-            }
-            
-            spell_recommendations = {
-                "Sorcerer": ["Glintstone Pebble", "Rock Sling", "Comet Azur"],
-                "Cleric": ["Heal", "Lightning Spear", "Black Flame"],
-                "Occult": ["Bloodflame Blade", "Dragon Communion"]
-            }
-            
-            stat_priority = {
-                "Strength": ["Vigor", "Endurance", "Strength"],
-                "Dexterity": ["Vigor", "Endurance", "Dexterity"],
-                "Quality": ["Vigor", "Strength", "Dexterity"],
-                "Sorcerer": ["Mind", "Intelligence", "Vigor"],
-                "Cleric": ["Mind", "Faith", "Vigor"],
-                "Occult": ["Arcane", "Mind", "Vigor"],
-                "Tank": ["Vigor", "Endurance", "Strength"],
-                "Hybrid": ["Vigor", "Mind", "Primary Stats"]
-            }
-            
-            playstyle_guide = {
-                "Strength": "Build enfocado en armas pesadas y daño físico alto. Prioriza armadura pesada y resistencia.",
-                "Dexterity": "Build ágil con armas rápidas. Enfócate en esquivar y ataques críticos.",
-                "Quality": "Build versátil que usa STR y DEX. Acceso a más opciones de armas.",
-                "Sorcerer": "Build de hechicero con magia ofensiva. Mantén distancia y usa hechizos poderosos.",
-                "Cleric": "Build de fe con incantaciones. Balance entre daño y soporte.",
-                "Occult": "Build basado en arcano. Efectos de estado y sangrado.",
-                "Tank": "Build defensivo con HP alto y armadura pesada.",
-                "Hybrid": "Build mixto con múltiples opciones de combate."
-            }
-            
             return BuildRecommendation(
                 class_name=class_model.name,
-                recommended_weapons=weapon_recommendations.get(archetype, ["Balanced Weapon"]),
-                recommended_spells=spell_recommendations.get(archetype, []),
-                recommended_stats_priority=stat_priority.get(archetype, primary_stats),
-                playstyle=playstyle_guide.get(archetype, "Build balanceado y versátil")
+                recommended_weapons=list(_WEAPON_RECOMMENDATIONS.get(archetype, ("Balanced Weapon",))),
+                recommended_spells=list(_SPELL_RECOMMENDATIONS.get(archetype, ())),
+                recommended_stats_priority=list(_STAT_PRIORITY_BY_ARCHETYPE.get(archetype, primary_stats)),
+                playstyle=_PLAYSTYLE_GUIDE.get(archetype, "Build balanceado y versátil")
             )
             
         except HTTPException:
@@ -447,6 +615,7 @@ class ClassService(BaseService[ClassResponse]):
                 detail="Error al generar recomendación"
             )
     
+    @cached()
     async def get_statistics(self) -> Dict[str, Any]:
         """
         Obtiene estadísticas generales de clases.
@@ -455,25 +624,51 @@ class ClassService(BaseService[ClassResponse]):
             Estadísticas agregadas
         """
         try:
-            documents = list(self.collection.find({}))
-            classes_models = [self._document_to_model(doc) for doc in documents]
-            
-            archetype_distribution = {}
-            for class_model in classes_models:
-                archetype = class_model.archetype
-                archetype_distribution[archetype] = archetype_distribution.get(archetype, 0) + 1
-            
-            level_range = {
-                "min": min(c.stats.level for c in classes_models if c.stats and c.stats.level),
-                "max": max(c.stats.level for c in classes_models if c.stats and c.stats.level),
-                "avg": sum(c.stats.level for c in classes_models if c.stats and c.stats.level) / len(classes_models)
-            }
+            pipeline = [
+                {
+                    "$facet": {
+                        "total": [{"$count": "n"}],
+                        "by_archetype": [
+                            {
+                                "$group": {
+                                    "_id": {"$ifNull": ["$archetype", "Balanced"]},
+                                    "count": {"$sum": 1}
+                                }
+                            }
+                        ],
+                        "level": [
+                            {
+                                "$group": {
+                                    "_id": None,
+                                    "min": {"$min": "$stats.level"},
+                                    "max": {"$max": "$stats.level"},
+                                    "sum": {"$sum": "$stats.level"}
+                                }
+                            }
+                        ],
+                        "names": [{"$project": {"_id": 0, "name": 1}}]
+                    }
+                }
+            ]
+            
+            results = await self.aggregate(pipeline)
+            facet = results[0] if results else {}
+            
+            total = facet["total"][0]["n"] if facet.get("total") else 0
+            level = facet["level"][0] if facet.get("level") else {}
             
             return {
-                "total_classes": len(classes_models),
-                "archetype_distribution": archetype_distribution,
-                "level_range": level_range,
-                "class_names": [c.name for c in classes_models]
+                "total_classes": total,
+                "archetype_distribution": {
+                    group["_id"]: group["count"] for group in facet.get("by_archetype", [])
+                },
+                "level_range": {
+                    "min": level.get("min"),
+                    "max": level.get("max"),
+                    # Promedio sobre el total de clases, como antes
+                    "avg": level["sum"] / total if total and level else None
+                },
+                "class_names": [doc["name"] for doc in facet.get("names", [])]
             }
             
         except Exception as e:
@@ -1,6 +1,11 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
+from types import MappingProxyType
 from fastapi import HTTPException, status
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+import asyncio
 import logging
+import re
 
 from app.services.base_service import BaseService
 from app.models.weapons import (
@@ -11,17 +16,171 @@ from app.models.weapons import (
     WeaponStatsComparison
 )
 from app.models.base import PaginationParams
+from app.utils.cache import cached
 
 logger = logging.getLogger(__name__)
 
+# Campos almacenados que usa WeaponResponse; las propiedades calculadas
+# (como damage_to_weight_ratio) se derivan en el modelo
+_WEAPON_PROJECTION = {
+    "name": 1, "image": 1, "description": 1, "category": 1,
+    "weight": 1, "attack": 1, "defence": 1, "scalesWith": 1,
+    "requiredAttributes": 1, "passive": 1, "critical": 1
+}
+
+# Filtros de rango: (campo en MongoDB, atributo mínimo, atributo máximo)
+_RANGE_FILTERS = (
+    ("weight", "min_weight", "max_weight"),
+    ("attack.physical", "min_damage", "max_damage"),
+    ("requiredAttributes.strength", "min_strength", "max_strength"),
+    ("requiredAttributes.dexterity", "min_dexterity", "max_dexterity"),
+)
+
+# Ratio daño total/peso persistido en cada documento (ver _sync_damage_ratio);
+# solo existe (> 0) en armas con peso y daño positivos
+_RATIO_MATCH = {"damageToWeightRatio": {"$gt": 0}}
+
+# Misma fórmula que WeaponResponse.damage_to_weight_ratio: suma de los daños
+# (los nulos cuentan 0) entre el peso, redondeada a 2 decimales
+_TOTAL_DAMAGE = {
+    "$add": [
+        {"$ifNull": [f"$attack.{damage}", 0]}
+        for damage in ("physical", "magic", "fire", "lightning", "holy")
+    ]
+}
+
+_RATIO_EXPRESSION = {
+    "$cond": [
+        {"$and": [{"$gt": ["$weight", 0]}, {"$gt": [_TOTAL_DAMAGE, 0]}]},
+        {"$round": [{"$divide": [_TOTAL_DAMAGE, "$weight"]}, 2]},
+        None
+    ]
+}
+
+# Documentos cuyo ratio guardado no coincide con la fórmula (o no lo tienen)
+_STALE_RATIO = {
+    "$expr": {
+        "$ne": [{"$ifNull": ["$damageToWeightRatio", None]}, _RATIO_EXPRESSION]
+    }
+}
+
+# Campos de las respuestas de ratio daño/peso
+_RATIO_PROJECTION = {
+    "name": 1,
+    "category": 1,
+    "weight": 1,
+    "attack": 1,
+    "image": 1,
+    "damageToWeightRatio": 1
+}
+
+# Grado mínimo de escalado -> grados que lo cumplen (de E a S)
+_SCALING_GRADES = ("E", "D", "C", "B", "A", "S")
+_SCALING_SUFFIX = MappingProxyType({
+    grade: list(_SCALING_GRADES[i:]) for i, grade in enumerate(_SCALING_GRADES)
+})
+
+# Grados de escalado aceptados por tipo de build (ver get_by_build_type)
+_BUILD_SCALING = MappingProxyType({
+    "strength": ["A", "S"],
+    "dexterity": ["A", "S"],
+    "quality": ["B", "A", "S"],
+    "intelligence": ["A", "S"],
+    "faith": ["A", "S"],
+    "arcane": ["A", "S"]
+})
+
 class WeaponService(BaseService[WeaponResponse]):
     """
     Servicio especializado para armas con análisis y optimizaciones.
     """
     
+    indexes = [
+        # get_best_damage_to_weight: recorre el índice en orden y para en `limit`;
+        # el compuesto sirve al filtro de categoría exacto de esa consulta.
+        # Los filtros de categoría del listado son regex sin distinguir
+        # mayúsculas y no pueden usar índices compuestos por category
+        IndexModel([("damageToWeightRatio", DESCENDING)]),
+        IndexModel([("category", ASCENDING), ("damageToWeightRatio", DESCENDING)]),
+        # top_damage de get_statistics y rango de daño del listado
+        IndexModel([("attack.physical", DESCENDING)]),
+        # Regex de _name_query: se resuelve recorriendo el índice sin leer documentos
+        IndexModel([("name", ASCENDING)]),
+        # Filtro has_passive (ver _backfill_passive)
+        IndexModel([("passive", ASCENDING)]),
+        # get_by_build_type y filtro scaling_grade
+        IndexModel([("scalesWith.strength", ASCENDING)]),
+        IndexModel([("scalesWith.dexterity", ASCENDING)]),
+        IndexModel([("scalesWith.intelligence", ASCENDING)]),
+        IndexModel([("scalesWith.faith", ASCENDING)]),
+        IndexModel([("scalesWith.arcane", ASCENDING)]),
+    ]
+    
+    # Compuestos por category que los filtros regex no pueden usar
+    obsolete_indexes = [
+        "category_1_weight_1_attack.physical_1",
+        "category_1_attack.physical_-1",
+    ]
+    
     def __init__(self):
         super().__init__("weapons", WeaponResponse)
     
+    async def startup(self) -> None:
+        """Crea índices, normaliza passive y persiste el ratio daño/peso."""
+        await super().startup()
+        await self._backfill_passive()
+        await self._sync_damage_ratio()
+    
+    async def _after_write(self, item_id: Optional[ObjectId] = None) -> None:
+        """Recalcula el ratio daño/peso del documento escrito e invalida la caché."""
+        # Primero el ratio: una lectura entre ambos pasos no debe cachear el valor viejo
+        await self._sync_damage_ratio(item_id)
+        await super()._after_write(item_id)
+    
+    async def _sync_damage_ratio(self, item_id: Optional[ObjectId] = None) -> None:
+        """
+        Guarda `damageToWeightRatio` (daño total / peso) en los documentos
+        donde falta o está desactualizado.
+        
+        Se calcula en el servidor con un update de pipeline, así el top por
+        ratio se resuelve con el índice en lugar de dividir en cada consulta.
+        
+        Args:
+            item_id: Limita la actualización a un arma; None revisa toda la
+                colección (arranque y escrituras masivas)
+        """
+        query = dict(_STALE_RATIO)
+        if item_id is not None:
+            query["_id"] = item_id
+        
+        try:
+            result = await self.collection.update_many(
+                query,
+                [{"$set": {"damageToWeightRatio": _RATIO_EXPRESSION}}]
+            )
+            if result.modified_count:
+                logger.info(f"Ratio daño/peso actualizado en {result.modified_count} armas")
+        except Exception as e:
+            logger.warning(f"No se pudo persistir el ratio daño/peso de armas: {e}")
+    
+    async def _backfill_passive(self) -> None:
+        """
+        Guarda `passive: null` en las armas que no tienen el campo.
+        
+        create ya lo escribe siempre; esto cubre los documentos cargados por
+        el pipeline de datos, para que has_passive=false sea una igualdad
+        exacta sobre el índice de passive.
+        """
+        try:
+            result = await self.collection.update_many(
+                {"passive": {"$exists": False}},
+                {"$set": {"passive": None}}
+            )
+            if result.modified_count:
+                logger.info(f"Campo passive normalizado en {result.modified_count} armas")
+        except Exception as e:
+            logger.warning(f"No se pudo normalizar passive en armas: {e}")
+    
     def _build_weapon_filter_query(self, filters: WeaponFilterParams) -> Dict[str, Any]:
         """
         Construye query específica para armas con filtros avanzados.
@@ -35,51 +194,26 @@ class WeaponService(BaseService[WeaponResponse]):
         query = {}
         
         if filters.name:
-            query["name"] = {"$regex": filters.name, "$options": "i"}
+            query.update(self._name_query(filters.name))
         
         if filters.category:
             query["category"] = {"$regex": filters.category, "$options": "i"}
         
-        if filters.min_weight is not None:
-            query["weight"] = {"$gte": filters.min_weight}
-        
-        if filters.max_weight is not None:
-            if "weight" in query:
-                query["weight"]["$lte"] = filters.max_weight
-            else:
-                query["weight"] = {"$lte": filters.max_weight}
-        
-        if filters.min_damage is not None:
-            query["attack.physical"] = {"$gte": filters.min_damage}
-        
-        if filters.max_damage is not None:
-            if "attack.physical" in query:
-                query["attack.physical"]["$lte"] = filters.max_damage
-            else:
-                query["attack.physical"] = {"$lte": filters.max_damage}
-        
-        if filters.min_strength is not None:
-            query["requiredAttributes.strength"] = {"$gte": filters.min_strength}
-        
-        if filters.max_strength is not None:
-            if "requiredAttributes.strength" in query:
-                query["requiredAttributes.strength"]["$lte"] = filters.max_strength
-            else:
-                query["requiredAttributes.strength"] = {"$lte": filters.max_strength}
-        
-        if filters.min_dexterity is not None:
-            query["requiredAttributes.dexterity"] = {"$gte": filters.min_dexterity}
-        
-        if filters.max_dexterity is not None:
-            if "requiredAttributes.dexterity" in query:
-                query["requiredAttributes.dexterity"]["$lte"] = filters.max_dexterity
-            else:
-                query["requiredAttributes.dexterity"] = {"$lte": filters.max_dexterity}
+        for field, min_attr, max_attr in _RANGE_FILTERS:
+            low = getattr(filters, min_attr)
+            high = getattr(filters, max_attr)
+            if low is None and high is None:
+                continue
+            
+            condition = {}
+            if low is not None:
+                condition["$gte"] = low
+            if high is not None:
+                condition["$lte"] = high
+            query[field] = condition
         
         if filters.scaling_grade:
-            scaling_grades = ['E', 'D', 'C', 'B', 'A', 'S']
-            min_index = scaling_grades.index(filters.scaling_grade)
-            valid_grades = scaling_grades[min_index:]
+            valid_grades = _SCALING_SUFFIX[filters.scaling_grade]
             
             query["$or"] = [
                 {"scalesWith.strength": {"$in": valid_grades}},
@@ -89,17 +223,75 @@ class WeaponService(BaseService[WeaponResponse]):
                 {"scalesWith.arcane": {"$in": valid_grades}}
             ]
         
+        # Igualdad con null: coincide con null y con campo ausente, sin $or
+        # (que además pisaba el $or de scaling_grade). Se usa $eq explícito
+        # porque _build_filter_query descarta los valores None
         if filters.has_passive is not None:
-            if filters.has_passive:
-                query["passive"] = {"$exists": True, "$ne": None}
-            else:
-                query["$or"] = [
-                    {"passive": {"$exists": False}},
-                    {"passive": None}
-                ]
+            query["passive"] = {"$ne": None} if filters.has_passive else {"$eq": None}
         
         return query
     
+    def _name_query(self, name: str) -> Dict[str, Any]:
+        """
+        Query de búsqueda por nombre.
+        
+        Un texto normal busca por subcadena, como espera la búsqueda del
+        frontend ("sword" encuentra "Greatsword"). Con comodines (`*`) se
+        usa una regex anclada en la que `*` equivale a cualquier secuencia
+        de caracteres ("Moon*" = empieza por "Moon"). En ambos casos es
+        case-insensitive y el resto del texto se escapa.
+        
+        Args:
+            name: Texto de búsqueda
+            
+        Returns:
+            Condición de MongoDB para combinar con el resto de la query
+        """
+        if "*" not in name:
+            return {"name": {"$regex": re.escape(name), "$options": "i"}}
+        
+        pattern = "^" + ".*".join(re.escape(part) for part in name.split("*")) + "$"
+        # "^Moon.*$" equivale a "^Moon": sin el sufijo el motor de regex termina antes
+        if pattern.endswith(".*$"):
+            pattern = pattern[:-3]
+        return {"name": {"$regex": pattern, "$options": "i"}}
+    
+    def _category_query(self, category: str) -> Dict[str, Any]:
+        """Query de armas de una categoría exacta (case-insensitive)."""
+        return {"category": {"$regex": f"^{category}$", "$options": "i"}}
+    
+    def _build_type_query(self, build_type: str) -> Dict[str, Any]:
+        """
+        Query de armas con buen escalado para un tipo de build.
+        
+        Args:
+            build_type: Tipo de build (strength, dexterity, quality, int, faith)
+            
+        Returns:
+            Query de MongoDB
+            
+        Raises:
+            HTTPException: Si el tipo de build no es válido
+        """
+        build_type = build_type.lower()
+        
+        if build_type not in _BUILD_SCALING:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Build type inválido. Opciones: {', '.join(_BUILD_SCALING.keys())}"
+            )
+        
+        grades = _BUILD_SCALING[build_type]
+        
+        if build_type == "quality":
+            return {
+                "$or": [
+                    {"scalesWith.strength": {"$in": grades}},
+                    {"scalesWith.dexterity": {"$in": grades}}
+                ]
+            }
+        return {f"scalesWith.{build_type}": {"$in": grades}}
+    
     async def get_weapons(
         self,
         filters: Optional[WeaponFilterParams] = None,
@@ -125,6 +317,8 @@ class WeaponService(BaseService[WeaponResponse]):
             # Pasar query como dict de filtros, no como query directa
             return await self.get_many(filters=query, pagination=pagination)
             
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error obteniendo armas: {e}")
             raise HTTPException(
@@ -136,7 +330,7 @@ class WeaponService(BaseService[WeaponResponse]):
         Devuelve la lista de categorías únicas de armas.
         """
         try:
-            categories = self.collection.distinct("category")
+            categories = await self.collection.distinct("category")
             return sorted([c for c in categories if c])
         except Exception as e:
             logger.error(f"Error obteniendo categorías de armas: {e}")
@@ -145,6 +339,7 @@ class WeaponService(BaseService[WeaponResponse]):
                 detail="Error al obtener categorías de armas"
             )
         
+    @cached()
     async def get_by_category(self, category: str) -> List[WeaponResponse]:
         """
         Obtiene todas las armas de una categoría.
@@ -157,11 +352,11 @@ class WeaponService(BaseService[WeaponResponse]):
             Lista de armas
         """
         try:
-            query = {"category": {"$regex": f"^{category}$", "$options": "i"}}
+            query = self._category_query(category)
             
-            documents = list(self.collection.find(query))
+            documents = await self.collection.find(query, _WEAPON_PROJECTION).to_list()
             
-            return [self._document_to_model(doc) for doc in documents]
+            return self._documents_to_models(documents)
             
         except Exception as e:
             logger.error(f"Error obteniendo armas por categoría {category}: {e}")
@@ -170,6 +365,7 @@ class WeaponService(BaseService[WeaponResponse]):
                 detail="Error al obtener armas por categoría"
             )
     
+    @cached()
     async def get_best_damage_to_weight(
         self,
         limit: int = 10,
@@ -187,41 +383,82 @@ class WeaponService(BaseService[WeaponResponse]):
             Lista de armas ordenadas por ratio daño/peso
         """
         try:
-            match_stage = {
-                "weight": {"$gt": 0, "$ne": None},
-                "attack.physical": {"$gt": 0, "$ne": None}
-            }
+            match_stage = dict(_RATIO_MATCH)
             
             if category:
                 match_stage["category"] = category
             
             pipeline = [
                 {"$match": match_stage},
+                {"$sort": {"damageToWeightRatio": -1}},
+                {"$limit": limit},
+                {"$project": _RATIO_PROJECTION}
+            ]
+            
+            # Resultado de `limit` documentos: todo en el primer lote, en memoria
+            return await self.aggregate(pipeline, allowDiskUse=False, batchSize=limit)
+            
+        except Exception as e:
+            logger.error(f"Error calculando mejor ratio daño/peso: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error en análisis de armas"
+            )
+    
+    @cached()
+    async def get_best_damage_to_weight_by_category(
+        self,
+        limit: int = 3
+    ) -> List[Dict[str, Any]]:
+        """
+        Obtiene las armas con mejor relación daño/peso de cada categoría.
+        
+        Una sola agregación: $setWindowFields numera las armas dentro de
+        cada categoría y se conservan las `limit` primeras, en lugar de
+        lanzar una consulta por categoría.
+        
+        Args:
+            limit: Número de armas por categoría
+            
+        Returns:
+            Lista de {category, weapons} ordenada por categoría
+        """
+        try:
+            pipeline = [
+                {"$match": _RATIO_MATCH},
+                {"$project": _RATIO_PROJECTION},
                 {
-                    "$addFields": {
-                        "damageToWeightRatio": {
-                            "$divide": ["$attack.physical", "$weight"]
-                        }
+                    "$setWindowFields": {
+                        "partitionBy": "$category",
+                        "sortBy": {"damageToWeightRatio": -1},
+                        "output": {"rank": {"$documentNumber": {}}}
                     }
                 },
-                {"$sort": {"damageToWeightRatio": -1}},
-                {"$limit": limit},
+                {"$match": {"rank": {"$lte": limit}}},
+                {"$sort": {"category": 1, "rank": 1}},
                 {
-                    "$project": {
-                        "name": 1,
-                        "category": 1,
-                        "weight": 1,
-                        "attack": 1,
-                        "damageToWeightRatio": 1,
-                        "image": 1
+                    "$group": {
+                        "_id": "$category",
+                        "weapons": {
+                            "$push": {
+                                "_id": "$_id",
+                                "name": "$name",
+                                "weight": "$weight",
+                                "attack": "$attack",
+                                "image": "$image",
+                                "damageToWeightRatio": "$damageToWeightRatio"
+                            }
+                        }
                     }
-                }
+                },
+                {"$sort": {"_id": 1}},
+                {"$project": {"_id": 0, "category": "$_id", "weapons": 1}}
             ]
             
-            return await self.aggregate(pipeline)
+            return await self.aggregate(pipeline, allowDiskUse=False)
             
         except Exception as e:
-            logger.error(f"Error calculando mejor ratio daño/peso: {e}")
+            logger.error(f"Error calculando mejor ratio daño/peso por categoría: {e}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Error en análisis de armas"
@@ -241,13 +478,14 @@ class WeaponService(BaseService[WeaponResponse]):
             Análisis comparativo completo
         """
         try:
-            from bson import ObjectId
-            
+            # WeaponStatsComparison ya rechaza IDs duplicados y exige al menos 2
             weapon_ids = [
                 self._validate_object_id(wid) for wid in comparison.weapon_ids
             ]
             
-            weapons = list(self.collection.find({"_id": {"$in": weapon_ids}}))
+            weapons = await self.collection.find(
+                {"_id": {"$in": weapon_ids}}, _WEAPON_PROJECTION
+            ).to_list(length=len(weapon_ids))
             
             if len(weapons) != len(weapon_ids):
                 raise HTTPException(
@@ -255,33 +493,29 @@ class WeaponService(BaseService[WeaponResponse]):
                     detail="Una o más armas no encontradas"
                 )
             
-            weapons_models = [self._document_to_model(w) for w in weapons]
+            weapons_models = self._documents_to_models(weapons)
+            
+            # Columnas paralelas (una lista por métrica); max/min e index
+            # recorren cada lista en C. Con empates gana la primera arma
+            names = [w.name for w in weapons_models]
+            damage = [w.attack.physical if w.attack else 0 for w in weapons_models]
+            weight = [w.weight for w in weapons_models]
+            ratio = [w.damage_to_weight_ratio for w in weapons_models]
+            
+            damage_keys = [d or 0 for d in damage]
+            ratio_keys = [r or 0 for r in ratio]
+            weight_keys = [wt or float('inf') for wt in weight]
             
             comparison_data = {
                 "weapons": weapons_models,
                 "stats_comparison": {
-                    "damage": {
-                        w.name: w.attack.physical if w.attack else 0 
-                        for w in weapons_models
-                    },
-                    "weight": {w.name: w.weight for w in weapons_models},
-                    "damage_to_weight_ratio": {
-                        w.name: w.damage_to_weight_ratio 
-                        for w in weapons_models
-                    }
+                    "damage": dict(zip(names, damage)),
+                    "weight": dict(zip(names, weight)),
+                    "damage_to_weight_ratio": dict(zip(names, ratio))
                 },
-                "winner_by_damage": max(
-                    weapons_models,
-                    key=lambda w: w.attack.physical if w.attack and w.attack.physical else 0
-                ).name,
-                "winner_by_ratio": max(
-                    weapons_models,
-                    key=lambda w: w.damage_to_weight_ratio or 0
-                ).name,
-                "lightest": min(
-                    weapons_models,
-                    key=lambda w: w.weight or float('inf')
-                ).name
+                "winner_by_damage": names[damage_keys.index(max(damage_keys))],
+                "winner_by_ratio": names[ratio_keys.index(max(ratio_keys))],
+                "lightest": names[weight_keys.index(min(weight_keys))]
             }
             
             return comparison_data
@@ -295,6 +529,7 @@ class WeaponService(BaseService[WeaponResponse]):
                 detail="Error en comparación de armas"
             )
     
+    @cached()
     async def get_by_build_type(self, build_type: str) -> List[WeaponResponse]:
         """
         Recomienda armas para un tipo de build específico.
@@ -306,38 +541,11 @@ class WeaponService(BaseService[WeaponResponse]):
             Armas recomendadas
         """
         try:
-            build_type = build_type.lower()
-            
-            scaling_map = {
-                "strength": ["A", "S"],
-                "dexterity": ["A", "S"],
-                "quality": ["B", "A", "S"],
-                "intelligence": ["A", "S"],
-                "faith": ["A", "S"],
-                "arcane": ["A", "S"]
-            }
-            
-            if build_type not in scaling_map:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Build type inválido. Opciones: {', '.join(scaling_map.keys())}"
-                )
-            
-            grades = scaling_map[build_type]
-            
-            if build_type == "quality":
-                query = {
-                    "$or": [
-                        {"scalesWith.strength": {"$in": grades}},
-                        {"scalesWith.dexterity": {"$in": grades}}
-                    ]
-                }
-            else:
-                query = {f"scalesWith.{build_type}": {"$in": grades}}
+            query = self._build_type_query(build_type)
             
-            documents = list(self.collection.find(query).limit(20))
+            documents = await self.collection.find(query, _WEAPON_PROJECTION).to_list(length=20)
             
-            return [self._document_to_model(doc) for doc in documents]
+            return self._documents_to_models(documents)
             
         except HTTPException:
             raise
@@ -348,6 +556,7 @@ class WeaponService(BaseService[WeaponResponse]):
                 detail="Error al obtener armas por build"
             )
     
+    @cached()
     async def get_statistics(self) -> Dict[str, Any]:
         """
         Obtiene estadísticas generales de armas.
@@ -357,44 +566,47 @@ class WeaponService(BaseService[WeaponResponse]):
             Estadísticas agregadas
         """
         try:
-            pipeline = [
+            by_category_pipeline = [
+                {"$group": {"_id": "$category", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1}}
+            ]
+            
+            avg_stats_pipeline = [
                 {
-                    "$facet": {
-                        "by_category": [
-                            {"$group": {"_id": "$category", "count": {"$sum": 1}}},
-                            {"$sort": {"count": -1}}
-                        ],
-                        "avg_stats": [
-                            {
-                                "$group": {
-                                    "_id": None,
-                                    "avg_weight": {"$avg": "$weight"},
-                                    "avg_physical_damage": {"$avg": "$attack.physical"},
-                                    "total_weapons": {"$sum": 1}
-                                }
-                            }
-                        ],
-                        "top_damage": [
-                            {"$sort": {"attack.physical": -1}},
-                            {"$limit": 5},
-                            {
-                                "$project": {
-                                    "name": 1,
-                                    "category": 1,
-                                    "damage": "$attack.physical"
-                                }
-                            }
-                        ]
+                    "$group": {
+                        "_id": None,
+                        "avg_weight": {"$avg": "$weight"},
+                        "avg_physical_damage": {"$avg": "$attack.physical"},
+                        "total_weapons": {"$sum": 1}
                     }
                 }
             ]
             
-            results = await self.aggregate(pipeline)
+            # Fuera de un $facet, $sort + $limit puede usar el índice de attack.physical
+            top_damage_pipeline = [
+                {"$sort": {"attack.physical": -1}},
+                {"$limit": 5},
+                {
+                    "$project": {
+                        "name": 1,
+                        "category": 1,
+                        "damage": "$attack.physical"
+                    }
+                }
+            ]
             
-            if results:
-                return results[0]
+            # Resultados pequeños: sin volcado a disco y sin getMore
+            by_category, avg_stats, top_damage = await asyncio.gather(
+                self.aggregate(by_category_pipeline, allowDiskUse=False),
+                self.aggregate(avg_stats_pipeline, allowDiskUse=False),
+                self.aggregate(top_damage_pipeline, allowDiskUse=False, batchSize=5)
+            )
             
-            return {}
+            return {
+                "by_category": by_category,
+                "avg_stats": avg_stats,
+                "top_damage": top_damage
+            }
             
         except Exception as e:
             logger.error(f"Error obteniendo estadísticas de armas: {e}")
@@ -402,4 +614,35 @@ class WeaponService(BaseService[WeaponResponse]):
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Error al calcular estadísticas"
             )
+    
+    async def stream_by_category(self, category: str) -> AsyncIterator[bytes]:
+        """
+        Versión en streaming (NDJSON) de get_by_category.
+        
+        Args:
+            category: Categoría de arma
+            
+        Returns:
+            Iterador de líneas NDJSON para StreamingResponse
+        """
+        return await self.stream_ndjson(self._category_query(category), _WEAPON_PROJECTION)
+    
+    async def stream_by_build_type(self, build_type: str) -> AsyncIterator[bytes]:
+        """
+        Versión en streaming (NDJSON) de get_by_build_type.
+        
+        Args:
+            build_type: Tipo de build
+            
+        Returns:
+            Iterador de líneas NDJSON para StreamingResponse
+            
+        Raises:
+            HTTPException: Si el tipo de build no es válido o la consulta falla
+                (antes de empezar a enviar)
+        """
+        return await self.stream_ndjson(
+            self._build_type_query(build_type), _WEAPON_PROJECTION, limit=20
+        )
+
 weapon_service = WeaponService()
\ No newline at end of file
@@ -0,0 +1,160 @@
+from typing import Any, Callable, Hashable, Optional, Tuple
+from collections import OrderedDict
+import asyncio
+import functools
+import time
+import uuid
+
+from fastapi import HTTPException, Request, Response
+
+from app.config import settings
+
+_MISSING = object()
+
+# Distingue procesos: la generación de caché vuelve a 0 en cada arranque
+_BOOT_ID = uuid.uuid4().hex[:12]
+
+
+class TTLCache:
+    """
+    Caché en memoria con expiración por entrada (TTL) y tamaño máximo.
+
+    Pensada para resultados de consultas sobre datos del juego que casi
+    nunca cambian. Cuando se alcanza `maxsize` se descarta la entrada
+    más antigua.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = 900):
+        """
+        Args:
+            maxsize: Número máximo de entradas
+            ttl: Tiempo de vida por defecto en segundos
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Retorna el valor si existe y no ha expirado."""
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return default
+
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Guarda un valor con su tiempo de expiración."""
+        self._data.pop(key, None)
+        if len(self._data) >= self.maxsize:
+            self._data.popitem(last=False)
+
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+
+    def clear(self) -> None:
+        """Invalida todas las entradas."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def _finish_inflight(
+    service: Any,
+    key: Hashable,
+    ttl: Optional[float],
+    generation: int,
+    task: "asyncio.Task[Any]"
+) -> None:
+    """
+    Cachea el resultado de una consulta compartida y la retira de `_inflight`.
+
+    Si hubo una escritura mientras corría (cambió `_cache_generation`), el
+    resultado puede ser anterior a ella y no se cachea.
+    """
+    if service._inflight.get(key) is task:
+        del service._inflight[key]
+    if task.cancelled():
+        return
+    if task.exception() is None and service._cache_generation == generation:
+        service._cache.set(key, task.result(), ttl)
+
+
+def cached(ttl: Optional[float] = None) -> Callable:
+    """
+    Decorador para métodos async de servicios que cachea el resultado
+    en `self._cache`, usando como clave el nombre del método y sus argumentos.
+
+    Las excepciones no se cachean. La invalidación se hace vaciando la
+    caché del servicio tras cada escritura (ver BaseService._after_write),
+    que además descarta las consultas en curso.
+
+    Si ya hay una llamada en curso con la misma clave, las siguientes
+    esperan su resultado en lugar de lanzar otra consulta (single-flight),
+    usando `self._inflight`. La consulta corre en una tarea propia, así que
+    la cancelación de cualquier llamador (también el primero) no afecta a
+    los demás.
+
+    Args:
+        ttl: Tiempo de vida en segundos (por defecto settings.CACHE_TTL_SECONDS)
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            if not settings.CACHE_ENABLED:
+                return await func(self, *args, **kwargs)
+
+            key = (func.__name__, args, tuple(sorted(kwargs.items())))
+            result = self._cache.get(key, _MISSING)
+            if result is not _MISSING:
+                return result
+
+            task = self._inflight.get(key)
+            if task is None:
+                # La consulta corre en su propia tarea: si el llamador que la
+                # lanzó se desconecta, no se cancela para el resto
+                task = asyncio.ensure_future(func(self, *args, **kwargs))
+                self._inflight[key] = task
+                task.add_done_callback(
+                    functools.partial(
+                        _finish_inflight, self, key, ttl, self._cache_generation
+                    )
+                )
+
+            # shield: la cancelación de un llamador no cancela la tarea compartida
+            return await asyncio.shield(task)
+
+        return wrapper
+
+    return decorator
+
+
+def etag_cache(service: Any) -> Callable:
+    """
+    Dependencia de FastAPI que añade un ETag ligado a las escrituras del
+    servicio y responde 304 si el cliente ya tiene esa versión.
+
+    El ETag cambia con `service._cache_generation`, que se incrementa en
+    cada escritura (ver BaseService._after_write), así que a diferencia de
+    un max-age fijo nunca se sirven datos viejos: el cliente revalida
+    siempre (`no-cache`) y solo se ahorra el cuerpo de la respuesta.
+
+    Args:
+        service: Servicio cuyas escrituras invalidan la respuesta
+    """
+    def dependency(request: Request, response: Response) -> None:
+        etag = f'W/"{_BOOT_ID}-{service._cache_generation}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in (tag.strip() for tag in if_none_match.split(",")):
+            raise HTTPException(status_code=304, headers=headers)
+
+        response.headers.update(headers)
+
+    return dependency
@@ -0,0 +1,38 @@
+from app.models.weapons import WeaponFilterParams
+from app.services.weapons import weapon_service
+
+
+def _final_query(filters: WeaponFilterParams) -> dict:
+    """Query tal como llega a MongoDB desde get_weapons -> get_many."""
+    query = weapon_service._build_weapon_filter_query(filters)
+    return weapon_service._build_filter_query(query)
+
+
+def test_has_passive_false_filters_null_or_missing_passive():
+    assert _final_query(WeaponFilterParams(has_passive=False)) == {
+        "passive": {"$eq": None}
+    }
+
+
+def test_has_passive_true_filters_non_null_passive():
+    assert _final_query(WeaponFilterParams(has_passive=True)) == {
+        "passive": {"$ne": None}
+    }
+
+
+def test_has_passive_does_not_overwrite_scaling_grade():
+    query = _final_query(WeaponFilterParams(has_passive=False, scaling_grade="A"))
+    assert query["passive"] == {"$eq": None}
+    assert len(query["$or"]) == 5
+
+
+def test_plain_name_is_escaped_substring_search():
+    assert _final_query(WeaponFilterParams(name="sword (+1)")) == {
+        "name": {"$regex": r"sword\ \(\+1\)", "$options": "i"}
+    }
+
+
+def test_wildcard_name_is_anchored():
+    assert _final_query(WeaponFilterParams(name="Moon*")) == {
+        "name": {"$regex": "^Moon", "$options": "i"}
+    }